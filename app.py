@@ -1,23 +1,26 @@
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
 import logging
+import dataclasses
 import tempfile
 import sys
 import requests
 import time
+import orjson
 from firebase_admin import firestore
 from auth_middleware import require_auth, optional_auth, require_admin
-from search import WhooshSearchProvider, MapboxSearchProvider, GooglePlacesSearchProvider, SearchOrchestrator
+from search import WhooshSearchProvider, FTS5SearchProvider, MapboxSearchProvider, GooglePlacesSearchProvider, SearchOrchestrator
 from search.storage import PlaceStorage
 import whoosh
-from whoosh.fields import Schema, TEXT, ID, STORED
-from whoosh.analysis import StandardAnalyzer
+from search.whoosh_provider import build_schema
 from search.detail_place import DetailPlace
 from search.search_result import SearchResult
+from search.place_fields import search_fields
 from url_processors.orchestrator import URLProcessorOrchestrator
 from url_processors.geocoding_service import GeocodingService
+from url_processors.sanitize import strip_control_chars
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -34,28 +37,34 @@ whoosh_index_dir = os.getenv('WHOOSH_INDEX_DIR', 'whoosh_index')
 os.makedirs(whoosh_index_dir, exist_ok=True)
 logger.info(f"Using Whoosh index directory: {whoosh_index_dir}")
 
+# Local search backend: 'whoosh' (default) or 'fts5' for SQLite full-text search
+search_backend = os.getenv('SEARCH_BACKEND', 'whoosh').lower()
+
 # Initialize search providers
 try:
-    # Initialize Whoosh with schema
-    schema = Schema(
-        name=TEXT(stored=True, analyzer=StandardAnalyzer()),
-        place_id=ID(stored=True),
-        address=STORED,
-        latitude=STORED,
-        longitude=STORED
-    )
-    if not whoosh.index.exists_in(whoosh_index_dir):
-        whoosh.index.create_in(whoosh_index_dir, schema)
+    if search_backend == 'fts5':
+        whoosh_provider = FTS5SearchProvider(db_path=os.getenv('FTS5_DB_PATH', 'places_fts.db'))
         # Populate the index from Firestore if it's empty
-        try:
-            from index_places import index_places_from_firestore
-            logger.info("Populating Whoosh index from Firestore...")
-            index_places_from_firestore()
-            logger.info("Whoosh index population completed")
-        except Exception as e:
-            logger.error(f"Error populating Whoosh index: {str(e)}")
-    whoosh_provider = WhooshSearchProvider(index_path=whoosh_index_dir)
-    logger.info("Whoosh search provider initialized successfully")
+        if whoosh_provider.get_index_info().get('is_empty'):
+            logger.info("Populating FTS5 index from Firestore...")
+            whoosh_provider.rebuild_from_firestore()
+        logger.info("FTS5 search provider initialized successfully")
+    else:
+        # Initialize Whoosh with the shared schema
+        if not whoosh.index.exists_in(whoosh_index_dir):
+            whoosh.index.create_in(whoosh_index_dir, build_schema())
+            # Populate the index from Firestore if it's empty
+            try:
+                from index_places import index_places_from_firestore
+                logger.info("Populating Whoosh index from Firestore...")
+                index_places_from_firestore()
+                logger.info("Whoosh index population completed")
+            except Exception as e:
+                logger.error(f"Error populating Whoosh index: {str(e)}")
+        whoosh_provider = WhooshSearchProvider(index_path=whoosh_index_dir)
+        # Persist the index regularly when it is served from memory (WHOOSH_MEMORY_DIR)
+        whoosh_provider.start_periodic_flush()
+        logger.info(f"Whoosh search provider initialized successfully at {whoosh_provider.index_path}")
 except Exception as e:
     logger.error(f"Error initializing Whoosh search provider: {str(e)}")
     whoosh_provider = None
@@ -92,7 +101,13 @@ search_orchestrator = SearchOrchestrator(
 )
 
 # Initialize place storage for nearby places endpoint
-place_storage = PlaceStorage()
+place_storage = PlaceStorage.get()
+# Places saved through storage are indexed incrementally by the provider serving search
+if whoosh_provider is not None:
+    place_storage.set_search_index(whoosh_provider)
+
+# URL processors are shared across requests so their token caches persist
+url_processor_orchestrator = URLProcessorOrchestrator()
 
 @app.route('/', methods=['GET'])
 def index():
@@ -227,7 +242,7 @@ def get_place_details():
         if provider != 'local' and whoosh_provider is not None:
             try:
                 # First save to Firestore to get the correct document ID
-                storage = PlaceStorage()
+                storage = PlaceStorage.get()
                 # Create SearchResult with original external ID for duplicate checking
                 search_result_for_duplicate_check = SearchResult(
                     name=detail_place.name,
@@ -244,13 +259,14 @@ def get_place_details():
                 
                 if not existing_id:
                     # Get Firestore connection from storage
-                    if hasattr(storage, 'db'):
-                        places_ref = storage.db.collection('places')
+                    if storage.db is not None:
+                        places_ref = storage.places_ref
                         # Use the DetailPlace to_firestore_dict method
                         place_data = detail_place.to_firestore_dict()
-                        # Save to Firestore
-                        doc_ref = places_ref.add(place_data)
-                        firestore_document_id = doc_ref[1].id
+                        # Save to Firestore under the ID the provider gave the place
+                        places_ref.document(detail_place.id).set(place_data, merge=True)
+                        storage._note_spatial_write(detail_place.id, detail_place.coordinate.latitude, detail_place.coordinate.longitude)
+                        firestore_document_id = detail_place.id
                         logger.info(f"Saved place to Firestore with ID: {firestore_document_id}")
                 else:
                     firestore_document_id = existing_id
@@ -271,8 +287,8 @@ def get_place_details():
                     whoosh_provider.save_place(search_result_for_whoosh)
                     logger.info(f"Saved place to Whoosh index with Firestore ID: {detail_place.name}")
                     
-                    # Update the detail_place ID to match the Firestore ID
-                    detail_place.id = firestore_document_id
+                    # Use the Firestore ID for the returned place
+                    detail_place = dataclasses.replace(detail_place, id=firestore_document_id)
                     
             except Exception as e:
                 logger.error(f"Error saving place: {str(e)}")
@@ -322,6 +338,11 @@ def reindex_places():
         from index_places import index_places_from_firestore
         logger.info("Manual reindex triggered")
         
+        # The FTS5 backend rebuilds itself from Firestore
+        if isinstance(whoosh_provider, FTS5SearchProvider):
+            indexed = whoosh_provider.rebuild_from_firestore()
+            return jsonify({"status": "success", "message": f"Reindexed {indexed} places"}), 200
+        
         # Clear the Whoosh index first
         if whoosh_provider is not None:
             whoosh_provider.clear_index()
@@ -343,6 +364,23 @@ def reindex_places():
         logger.error(f"Error during reindex: {str(e)}", exc_info=True)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/admin/migrate-places', methods=['POST'])
+@require_admin
+def migrate_places_endpoint():
+    """Admin endpoint to migrate stored place documents to the current schema"""
+    try:
+        from migrate_places import migrate_places
+        logger.info("Place migration triggered")
+        
+        results = migrate_places()
+        if results is None:
+            return jsonify({"status": "error", "message": "Firestore database not available"}), 503
+        
+        return jsonify({"status": "success", "migrated": results}), 200
+    except Exception as e:
+        logger.error(f"Error migrating places: {str(e)}", exc_info=True)
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/admin/index-status', methods=['GET'])
 @require_admin
 def get_index_status():
@@ -517,7 +555,7 @@ def nearby_places():
         # Make the API request
         response = requests.get(base_url, params=params)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data.get("status") != "OK":
             logger.error(f"Google Places API error: {data.get('status')} - {data.get('error_message', 'Unknown error')}")
@@ -533,6 +571,7 @@ def nearby_places():
         features = []
         saved_to_whoosh = 0
         saved_to_firestore = 0
+        whoosh_places = []
         
         for place in places:
             geometry = place.get("geometry", {})
@@ -561,12 +600,11 @@ def nearby_places():
                     firestore_document_id = existing_id
                 else:
                     # Save new place using same structure as GooglePlacesSearchProvider
-                    import uuid
-                    place_uuid = str(uuid.uuid4()).upper()
+                    place_uuid = place_storage._doc_id_for(search_result)
                     
                     # Save directly to Firestore with proper structure (same as GooglePlacesSearchProvider)
                     if place_storage.db:
-                        places_ref = place_storage.db.collection('places')
+                        places_ref = place_storage.places_ref
                         place_data = {
                             'id': place_uuid,
                             'name': place.get("name", ""),
@@ -574,7 +612,8 @@ def nearby_places():
                             'city': "",  # Nearby API doesn't provide detailed address components
                             'googlePlacesId': place.get("place_id"),
                             'mapboxId': None,  # Not applicable for Google Places
-                            'coordinate': firestore.GeoPoint(location.get("lat"), location.get("lng")),
+                            'coordinates': {'latitude': location.get("lat"), 'longitude': location.get("lng")},
+                            **search_fields(place.get("name", ""), location.get("lat"), location.get("lng")),
                             'categories': place.get("types", []),
                             'phone': None,  # Not provided by Nearby Search API
                             'rating': place.get("rating"),
@@ -591,28 +630,23 @@ def nearby_places():
                         
                         # Create document with specific ID (same as GooglePlacesSearchProvider)
                         doc_ref = places_ref.document(place_uuid)
-                        doc_ref.set(place_data)
+                        doc_ref.set(place_data, merge=True)
+                        place_storage._note_spatial_write(place_uuid, location.get("lat"), location.get("lng"))
                         saved_to_firestore += 1
                         firestore_document_id = place_uuid
                         logger.debug(f"Saved new place to Firestore: {search_result.name} (ID: {place_uuid})")
                 
                 # Save to Whoosh with Firestore document ID
+                # Collect for Whoosh with the Firestore document ID; indexed in one batch below
                 if whoosh_provider is not None and firestore_document_id:
-                    try:
-                        # Create SearchResult with Firestore document ID for Whoosh
-                        search_result_for_whoosh = SearchResult(
-                            name=place.get("name", ""),
-                            address=place.get("vicinity", ""),
-                            latitude=location.get("lat"),
-                            longitude=location.get("lng"),
-                            place_id=firestore_document_id,  # Use Firestore document ID
-                            source="google"
-                        )
-                        whoosh_provider.save_place(search_result_for_whoosh)
-                        saved_to_whoosh += 1
-                        logger.debug(f"Saved place to Whoosh index with Firestore ID: {search_result.name}")
-                    except Exception as e:
-                        logger.error(f"Error saving to Whoosh index: {str(e)}")
+                    whoosh_places.append(SearchResult(
+                        name=place.get("name", ""),
+                        address=place.get("vicinity", ""),
+                        latitude=location.get("lat"),
+                        longitude=location.get("lng"),
+                        place_id=firestore_document_id,  # Use Firestore document ID
+                        source="google"
+                    ))
                         
             except Exception as e:
                 logger.error(f"Error in caching process for place {place.get('name', 'Unknown')}: {str(e)}")
@@ -647,6 +681,13 @@ def nearby_places():
             
             features.append(feature)
         
+        if whoosh_places:
+            try:
+                saved_to_whoosh = whoosh_provider.save_places(whoosh_places)
+                logger.debug(f"Saved {saved_to_whoosh} places to Whoosh index with Firestore IDs")
+            except Exception as e:
+                logger.error(f"Error saving to Whoosh index: {str(e)}")
+        
         logger.info(f"Caching summary: {saved_to_whoosh}/{len(places)} places saved to Whoosh, {saved_to_firestore}/{len(places)} places saved to Firestore")
         logger.debug(f"Returning {len(features)} nearby places from Google API")
         
@@ -710,12 +751,10 @@ def process_url():
             logger.debug(f"Raw request data: {repr(raw_data)}")
             
             # Try to parse after cleaning common issues
-            import json
-            import re
             # Remove control characters
-            cleaned_data = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', raw_data)
+            cleaned_data = strip_control_chars(raw_data)
             try:
-                data = json.loads(cleaned_data)
+                data = orjson.loads(cleaned_data)
             except:
                 return jsonify({"error": "Invalid JSON in request body"}), 400
         
@@ -725,16 +764,14 @@ def process_url():
         url = data['url']
         
         # Clean the URL of any control characters
-        import re
-        url = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', url).strip()
+        url = strip_control_chars(url).strip()
         
-        # Initialize processors
-        orchestrator = URLProcessorOrchestrator()
+        # Initialize geocoding
         geocoding_service = GeocodingService()
         
         # Process the URL
         try:
-            result = orchestrator.process_url(url)
+            result = url_processor_orchestrator.process_url(url)
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
         
@@ -781,7 +818,7 @@ def process_url():
                 from search.storage import PlaceStorage
                 from search.base import SearchResult
                 
-                storage = PlaceStorage()
+                storage = PlaceStorage.get()
                 
                 # First check if we already have this TikTok URL
                 if 'tiktok' in url.lower():
@@ -918,8 +955,7 @@ def process_url():
                             result['external_place_id'] = external_id
                             place_saved = True
                             
-                            # Trigger reindex in background (optional)
-                            # storage.trigger_whoosh_reindex()
+                            # New places are added to the Whoosh index incrementally on save
                     else:
                         # Just save to places collection without user association
                         place_id = storage.save_place_with_tiktok_data(search_result, tiktok_videos)
@@ -945,15 +981,14 @@ def process_url():
 @app.route('/process-url/platforms', methods=['GET'])
 def get_supported_platforms():
     """Get list of supported platforms for URL processing."""
-    orchestrator = URLProcessorOrchestrator()
     return jsonify({
-        "supported_platforms": orchestrator.get_supported_platforms()
+        "supported_platforms": url_processor_orchestrator.get_supported_platforms()
     })
 
-@app.route('/privacy-policy', methods=['GET'])
-def privacy_policy():
-    """Privacy policy endpoint required for TikTok API integration."""
-    privacy_content = """
+# Privacy policy page as bytes, split around its two "last updated" dates; the
+# page is only rebuilt once a day and served as pre-encoded bytes
+_PRIVACY_CACHE = {"date": None, "body": None}
+_TEMPLATE_PRE = b"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -976,7 +1011,8 @@ def privacy_policy():
     </head>
     <body>
         <h1>Privacy Policy</h1>
-        <p class="last-updated">Last updated: """ + time.strftime("%B %d, %Y") + """</p>
+        <p class="last-updated">Last updated: """
+_TEMPLATE_MID = b"""</p>
         
         <div class="section">
             <h2>1. Information We Collect</h2>
@@ -1052,7 +1088,8 @@ def privacy_policy():
             <p>
                 <strong>Email:</strong> privacy@mesa-location-services.com<br>
                 <strong>Service:</strong> Mesa Location Services API<br>
-                <strong>Last Updated:</strong> """ + time.strftime("%B %d, %Y") + """
+                <strong>Last Updated:</strong> """
+_TEMPLATE_POST = b"""
             </p>
         </div>
 
@@ -1070,7 +1107,21 @@ def privacy_policy():
     </body>
     </html>
     """
-    return privacy_content, 200, {'Content-Type': 'text/html; charset=utf-8'}
+
+def _privacy_policy_body() -> bytes:
+    """Encoded privacy policy page, rebuilt only when the date changes."""
+    today = time.strftime("%B %d, %Y")
+    if _PRIVACY_CACHE["date"] != today:
+        date = today.encode("ascii")
+        _PRIVACY_CACHE["body"] = b"".join((_TEMPLATE_PRE, date, _TEMPLATE_MID, date, _TEMPLATE_POST))
+        _PRIVACY_CACHE["date"] = today
+    return _PRIVACY_CACHE["body"]
+
+@app.route('/privacy-policy', methods=['GET'])
+def privacy_policy():
+    """Privacy policy endpoint required for TikTok API integration."""
+    return Response(_privacy_policy_body(), mimetype="text/html",
+                    headers={"Cache-Control": "public, max-age=86400"})
 
 @app.route('/terms-of-service', methods=['GET'])
 def terms_of_service():
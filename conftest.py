@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+@pytest.fixture(scope="session")
+def client():
+    """In-process Flask test client, created once and shared by every test."""
+    from app import app
+    app.config['TESTING'] = True
+    return app.test_client()
+
+def _wait_for_health(base_url: str, timeout: float = 10) -> bool:
+    """Poll /health every 50 ms until it returns 200 or the timeout passes."""
+    # One pooled connection, reused by every probe
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if session.get(f"{base_url}/health", timeout=0.2).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.05)
+    return False
+
+@pytest.fixture(scope="session")
+def live_server():
+    """Serve the app from a background thread for tests that need a real HTTP server; yields its base URL."""
+    from werkzeug.serving import make_server
+    from app import app
+    # Port 0 lets the OS pick a free port
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        if not _wait_for_health(base_url):
+            pytest.fail("Flask app did not become healthy")
+        yield base_url
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
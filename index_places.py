@@ -3,6 +3,9 @@ import logging
 import firebase_admin
 from firebase_admin import credentials, firestore
 from search import WhooshSearchProvider
+from search.whoosh_provider import place_document
+from search.search_result import SearchResult
+from search.storage import extract_coordinates
 from dotenv import load_dotenv
 
 # Configure logging
@@ -12,8 +15,8 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def index_places_from_firestore():
-    """Index places from Firestore into the Whoosh index."""
+def index_places_from_firestore() -> bool:
+    """Index places from Firestore into the Whoosh index. Returns whether indexing succeeded."""
     # Use absolute path to the service account file
     cred_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
                             "Firebase Admin SDK Service Account.json")
@@ -54,19 +57,19 @@ def index_places_from_firestore():
                     continue
                 
                 # Get coordinates
-                coordinate = place_data.get('coordinate')
-                latitude = coordinate.latitude if coordinate else None
-                longitude = coordinate.longitude if coordinate else None
+                coordinates = extract_coordinates(place_data)
+                latitude, longitude = coordinates if coordinates else (None, None)
                 
                 # Create a document for the index - only index what we need
-                writer.add_document(
+                writer.add_document(**place_document(SearchResult(
                     name=name,  # This is the only field we'll search on
-                    place_id=str(place.id),
                     # Store these fields for the response but don't search on them
                     address=place_data.get('address', ''),
                     latitude=latitude or 0.0,
-                    longitude=longitude or 0.0
-                )
+                    longitude=longitude or 0.0,
+                    place_id=str(place.id),
+                    source='firestore'
+                )))
                 
                 logger.debug(f"Indexed place: {name}")
         
@@ -75,9 +78,11 @@ def index_places_from_firestore():
         # Force refresh the index to ensure we're using the latest data
         whoosh_provider.force_refresh()
         logger.info("Whoosh index refreshed after indexing")
+        return True
         
     except Exception as e:
         logger.error(f"Error indexing places: {str(e)}", exc_info=True)
+        return False
 
 if __name__ == "__main__":
     index_places_from_firestore() 
\ No newline at end of file
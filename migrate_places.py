@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Migrate stored place documents to the current schema.
+
+Run once after deploying, with Firebase credentials configured:
+
+    python migrate_places.py
+
+The same migrations can be started on a running server with POST /admin/migrate-places.
+Each step skips documents that are already migrated, so it is safe to run again.
+"""
+import logging
+import sys
+from typing import Optional
+from dotenv import load_dotenv
+
+from search.storage import PlaceStorage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+def migrate_places() -> Optional[dict]:
+    """Run every place document migration. Returns the number of places each
+    step updated, or None when Firestore isn't available."""
+    storage = PlaceStorage.get()
+    if storage.db is None:
+        logger.error("Firestore database not available for migration")
+        return None
+    
+    # GeoPoint 'coordinate' field -> 'coordinates' dict and lat_e6/lon_e6/geohash,
+    # then the name and location search fields, which need the coordinates
+    return {
+        'coordinates': storage.migrate_coordinates(),
+        'search_fields': storage.backfill_geohashes()
+    }
+
+if __name__ == "__main__":
+    results = migrate_places()
+    if results is None:
+        sys.exit(1)
+    for step, updated in results.items():
+        logger.info(f"{step}: updated {updated} places")
@@ -1,6 +1,7 @@
 from search.base import SearchProvider
 from search.search_result import SearchResult
 from search.whoosh_provider import WhooshSearchProvider
+from search.fts5_provider import FTS5SearchProvider
 from search.mapbox_provider import MapboxSearchProvider
 from search.google_provider import GooglePlacesSearchProvider
 from search.orchestrator import SearchOrchestrator
@@ -12,6 +13,7 @@ __all__ = [
     'SearchProvider',
     'SearchResult',
     'WhooshSearchProvider',
+    'FTS5SearchProvider',
     'MapboxSearchProvider',
     'GooglePlacesSearchProvider',
     'SearchOrchestrator',
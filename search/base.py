@@ -5,7 +5,7 @@ from search.search_result import SearchResult
 
 class SearchProvider(ABC):
     @abstractmethod
-    def search(self, query: str, limit: int = 10, latitude: float = None, longitude: float = None) -> List[SearchResult]:
+    def search(self, query: str, limit: int = 10, latitude: Optional[float] = None, longitude: Optional[float] = None) -> List[SearchResult]:
         """Search for places matching the query."""
         pass
         
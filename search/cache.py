@@ -1,37 +1,51 @@
 import logging
+import threading
 import time
-from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 from search.base import SearchResult
 
 logger = logging.getLogger(__name__)
 
 class PlacesCache:
-    def __init__(self, cache_duration: int = 3600):  # Default cache duration: 1 hour
-        self.cache: Dict[str, Tuple[List[SearchResult], datetime]] = {}
+    # Entries kept before the least recently used one is evicted
+    MAX_SIZE = 2048
+
+    def __init__(self, cache_duration: int = 3600, max_size: int = MAX_SIZE):  # Default cache duration: 1 hour
+        self.cache: 'OrderedDict[str, Tuple[Tuple[SearchResult, ...], float]]' = OrderedDict()
         self.cache_duration = cache_duration
+        self.max_size = max_size
+        self._lock = threading.Lock()
         self.session_token = None
         self.session_token_time = None
         
-    def _generate_cache_key(self, query: str, latitude: Optional[float], longitude: Optional[float]) -> str:
+    def _generate_cache_key(self, query: str, latitude: Optional[float], longitude: Optional[float], limit: Optional[int] = None) -> str:
         """Generate a cache key based on search parameters"""
         loc_str = f"{latitude},{longitude}" if latitude is not None and longitude is not None else "no-loc"
-        return f"{query}:{loc_str}"
+        return f"{query.lower().strip()}:{loc_str}:{limit}"
         
-    def get(self, query: str, latitude: Optional[float], longitude: Optional[float]) -> Optional[List[SearchResult]]:
+    def get(self, query: str, latitude: Optional[float], longitude: Optional[float], limit: Optional[int] = None) -> Optional[List[SearchResult]]:
         """Get cached results if they exist and are not expired"""
-        cache_key = self._generate_cache_key(query, latitude, longitude)
-        if cache_key in self.cache:
-            results, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < timedelta(seconds=self.cache_duration):
-                return results
+        cache_key = self._generate_cache_key(query, latitude, longitude, limit)
+        with self._lock:
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                results, cached_at = entry
+                if time.monotonic() - cached_at < self.cache_duration:
+                    self.cache.move_to_end(cache_key)
+                    return list(results)
+                del self.cache[cache_key]
         return None
         
-    def set(self, query: str, latitude: Optional[float], longitude: Optional[float], results: List[SearchResult]):
+    def set(self, query: str, latitude: Optional[float], longitude: Optional[float], results: List[SearchResult], limit: Optional[int] = None):
         """Cache the results with current timestamp"""
-        cache_key = self._generate_cache_key(query, latitude, longitude)
-        self.cache[cache_key] = (results, datetime.now())
+        cache_key = self._generate_cache_key(query, latitude, longitude, limit)
+        with self._lock:
+            self.cache[cache_key] = (tuple(results), time.monotonic())
+            self.cache.move_to_end(cache_key)
+            if len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
         
     def get_session_token(self) -> str:
         """Get or generate a new session token"""
@@ -41,4 +55,4 @@ class PlacesCache:
             current_time - self.session_token_time > 300):  # 5 minutes
             self.session_token = str(int(current_time))
             self.session_token_time = current_time
-        return self.session_token 
\ No newline at end of file
+        return self.session_token 
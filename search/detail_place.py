@@ -1,49 +1,62 @@
-import uuid
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from firebase_admin import firestore
 
 from search.search_result import SearchResult
+from search.ids import new_place_id
+from search.place_fields import search_fields
 
+# (attribute, Firestore key, default) for the fields copied straight from a place document
+_DETAIL_FIELDS = (
+    ('name', 'name', ''),
+    ('address', 'address', ''),
+    ('city', 'city', ''),
+    ('mapbox_id', 'mapboxId', None),
+    ('google_places_id', 'googlePlacesId', None),
+    ('categories', 'categories', []),
+    ('phone', 'phone', None),
+    ('rating', 'rating', None),
+    ('open_hours', 'openHours', []),
+    ('description', 'description', None),
+    ('price_level', 'priceLevel', None),
+    ('reservable', 'reservable', None),
+    ('serves_breakfast', 'servesBreakfast', None),
+    ('serves_lunch', 'servesLunch', None),
+    ('serves_dinner', 'servesDinner', None),
+    ('instagram', 'instagram', None),
+    ('twitter', 'twitter', None)
+)
+
+@dataclass(frozen=True, slots=True)
 class DetailPlace:
-    def __init__(self, 
-                 id: str,
-                 name: str,
-                 address: str,
-                 city: str = "",
-                 mapbox_id: str = None,
-                 google_places_id: str = None,
-                 coordinate: firestore.GeoPoint = None,
-                 categories: list = None,
-                 phone: str = None,
-                 rating: float = None,
-                 open_hours: list = None,
-                 description: str = None,
-                 price_level: str = None,
-                 reservable: bool = None,
-                 serves_breakfast: bool = None,
-                 serves_lunch: bool = None,
-                 serves_dinner: bool = None,
-                 instagram: str = None,
-                 twitter: str = None):
-        self.id = id
-        self.name = name
-        self.address = address
-        self.city = city
-        self.mapbox_id = mapbox_id
-        self.google_places_id = google_places_id
-        self.coordinate = coordinate or firestore.GeoPoint(0.0, 0.0)
-        self.categories = categories or []
-        self.phone = phone
-        self.rating = rating
-        self.open_hours = open_hours or []
-        self.description = description
-        self.price_level = price_level
-        self.reservable = reservable
-        self.serves_breakfast = serves_breakfast
-        self.serves_lunch = serves_lunch
-        self.serves_dinner = serves_dinner
-        self.instagram = instagram
-        self.twitter = twitter
+    id: str
+    name: str
+    address: str
+    city: str = ""
+    mapbox_id: Optional[str] = None
+    google_places_id: Optional[str] = None
+    coordinate: Optional[firestore.GeoPoint] = None
+    categories: Optional[list] = None
+    phone: Optional[str] = None
+    rating: Optional[float] = None
+    open_hours: Optional[list] = None
+    description: Optional[str] = None
+    price_level: Optional[str] = None
+    reservable: Optional[bool] = None
+    serves_breakfast: Optional[bool] = None
+    serves_lunch: Optional[bool] = None
+    serves_dinner: Optional[bool] = None
+    instagram: Optional[str] = None
+    twitter: Optional[str] = None
+
+    def __post_init__(self):
+        # Fill in defaults that can't be shared between instances
+        if self.coordinate is None:
+            object.__setattr__(self, 'coordinate', firestore.GeoPoint(0.0, 0.0))
+        if not self.categories:
+            object.__setattr__(self, 'categories', [])
+        if not self.open_hours:
+            object.__setattr__(self, 'open_hours', [])
 
     @classmethod
     def from_search_result(cls, search_result: SearchResult, source: str = None) -> 'DetailPlace':
@@ -51,7 +64,7 @@ class DetailPlace:
         additional_data = search_result.additional_data or {}
         
         return cls(
-            id=str(uuid.uuid4()).upper(),
+            id=new_place_id(),
             name=search_result.name,
             address=search_result.address,
             city=additional_data.get('city', ""),
@@ -72,6 +85,12 @@ class DetailPlace:
             twitter=additional_data.get('twitter')
         )
 
+    @classmethod
+    def from_firestore(cls, place_id: str, place_data: dict, coordinate: firestore.GeoPoint = None) -> 'DetailPlace':
+        """Create a DetailPlace from a Firestore place document."""
+        kwargs = {attr: place_data.get(key, default) for attr, key, default in _DETAIL_FIELDS}
+        return cls(id=place_id, coordinate=coordinate, **kwargs)
+
     def to_firestore_dict(self) -> dict:
         """Convert the DetailPlace to a dictionary format for Firestore."""
         return {
@@ -81,7 +100,8 @@ class DetailPlace:
             'city': self.city,
             'mapboxId': self.mapbox_id,
             'googlePlacesId': self.google_places_id,
-            'coordinate': self.coordinate,
+            'coordinates': {'latitude': self.coordinate.latitude, 'longitude': self.coordinate.longitude},
+            **search_fields(self.name, self.coordinate.latitude, self.coordinate.longitude),
             'categories': self.categories,
             'phone': self.phone,
             'rating': self.rating,
@@ -0,0 +1,153 @@
+import os
+import re
+import logging
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Iterable
+from firebase_admin import firestore
+
+from search.base import SearchProvider, SearchResult
+from search.storage import PlaceStorage, extract_coordinates
+from search.detail_place import DetailPlace
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def _match_query(query: str) -> str:
+    """Build an FTS5 MATCH expression requiring every word in the query.
+    Words are quoted so user input can't inject FTS5 query syntax."""
+    return ' '.join(f'"{token}"' for token in _TOKEN_RE.findall(query))
+
+class FTS5SearchProvider(SearchProvider):
+    """Local place search backed by an SQLite FTS5 table.
+
+    Drop-in alternative to WhooshSearchProvider: the name is indexed with
+    SQLite's C tokenizer and ranked with bm25, everything else is stored only.
+    """
+
+    def __init__(self, db_path: str = "places_fts.db"):
+        self.db_path = db_path
+        # One connection shared by all request threads, serialised by the lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS places USING fts5("
+                "name, place_id UNINDEXED, address UNINDEXED, latitude UNINDEXED, longitude UNINDEXED, "
+                "tokenize='porter unicode61')"
+            )
+        logger.debug(f"Initialized FTS5SearchProvider with database: {db_path}")
+        self.storage = PlaceStorage.get()
+        self._last_index_refresh = time.time()
+
+    def search(self, query: str, limit: int = 10, latitude: float = None, longitude: float = None) -> List[SearchResult]:
+        match = _match_query(query)
+        if not match:
+            return []
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT name, address, latitude, longitude, place_id FROM places "
+                "WHERE places MATCH ? ORDER BY bm25(places) LIMIT ?",
+                ('name:(' + match + ')', limit)
+            ).fetchall()
+
+        # Skip repeated entries for the same place, keeping the best ranked one
+        search_results = []
+        seen_places = set()
+        for name, address, lat, lon, place_id in rows:
+            place_key = (name.lower(), (address or '').lower(), lat, lon)
+            if place_key in seen_places:
+                continue
+            seen_places.add(place_key)
+            search_results.append(SearchResult(name, address or '', lat or 0.0, lon or 0.0, place_id, "local"))
+        return search_results
+
+    def get_place_details(self, place_id: str) -> DetailPlace:
+        try:
+            place_doc = self.storage.places_ref.document(place_id).get()
+            if not place_doc.exists:
+                raise ValueError(f"Place with ID {place_id} not found")
+
+            place_data = place_doc.to_dict()
+            coordinate = firestore.GeoPoint(*(extract_coordinates(place_data) or (0.0, 0.0)))
+            return DetailPlace.from_firestore(place_id, place_data, coordinate)
+        except Exception as e:
+            logger.error(f"Error getting place from Firestore: {str(e)}")
+            raise
+
+    def save_place(self, place: SearchResult) -> None:
+        self.save_places([place])
+
+    def save_places(self, places: Iterable[SearchResult], parallel: bool = False) -> int:
+        """Index many places in one transaction. Returns the number indexed.
+        parallel is accepted for compatibility with the Whoosh provider and ignored."""
+        rows = [
+            (place.name, place.place_id, place.address, place.latitude, place.longitude)
+            for place in places
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO places (name, place_id, address, latitude, longitude) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def update_places(self, places: List[SearchResult]) -> int:
+        """Add or replace places in the index, keyed by place_id. Returns the number indexed."""
+        rows = [
+            (place.name, place.place_id, place.address, place.latitude, place.longitude)
+            for place in places
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM places WHERE place_id = ?", [(row[1],) for row in rows])
+            self.conn.executemany(
+                "INSERT INTO places (name, place_id, address, latitude, longitude) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def rebuild_from_firestore(self) -> int:
+        """Replace the index contents with every place in Firestore. Returns the number indexed."""
+        self.clear_index()
+        indexed = self.save_places(self.storage._whoosh_place(doc) for doc in self.storage.iter_places())
+        logger.info(f"Indexed {indexed} places in FTS5")
+        return indexed
+
+    def clear_index(self) -> None:
+        """Clear all documents from the FTS5 index."""
+        logger.info("Clearing FTS5 index")
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM places")
+        logger.info("FTS5 index cleared successfully")
+
+    def force_refresh(self) -> None:
+        """SQLite readers always see committed data, so this only records the time."""
+        self._last_index_refresh = time.time()
+
+    def get_index_info(self) -> Dict[str, Any]:
+        """Get information about the current index state."""
+        try:
+            with self._lock:
+                doc_count = self.conn.execute("SELECT count(*) FROM places").fetchone()[0]
+            stats = {
+                "index_path": self.db_path,
+                "last_refresh": self._last_index_refresh,
+                "last_refresh_readable": time.ctime(self._last_index_refresh),
+                "doc_count": doc_count,
+                "is_empty": doc_count == 0
+            }
+            if os.path.exists(self.db_path):
+                stats["db_modified_time"] = os.path.getmtime(self.db_path)
+                stats["db_modified_time_readable"] = time.ctime(stats["db_modified_time"])
+            return stats
+        except Exception as e:
+            logger.error(f"Error getting index info: {str(e)}")
+            return {"error": str(e)}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,77 @@
+import math
+from typing import List, Tuple
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Meters per degree of latitude, and of longitude at the equator
+_METERS_PER_DEGREE = 111_320
+
+def _cell_degrees(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell at the given precision."""
+    lat_bits = (5 * precision) // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+def encode(latitude: float, longitude: float, precision: int = 9) -> str:
+    """Encode a coordinate as a geohash string."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_lo = mid
+            else:
+                bits <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(chars)
+
+def precision_for_radius(radius_meters: float, latitude: float = 0.0) -> int:
+    """Finest precision whose cells are at least as large as the radius at the
+    given latitude, so the center cell plus its 8 neighbours always cover the
+    search circle. Cells narrow by cos(latitude) away from the equator, so the
+    width is taken at the edge of the circle furthest from it."""
+    edge_latitude = min(abs(latitude) + radius_meters / _METERS_PER_DEGREE, 90.0)
+    cos_lat = math.cos(math.radians(edge_latitude))
+    for precision in range(9, 0, -1):
+        lat_step, lon_step = _cell_degrees(precision)
+        if min(lat_step, lon_step * cos_lat) * _METERS_PER_DEGREE >= radius_meters:
+            return precision
+    return 1
+
+def cover(latitude: float, longitude: float, radius_meters: float) -> List[str]:
+    """Geohash prefixes (center cell + 8 neighbours) covering a search radius."""
+    precision = precision_for_radius(radius_meters, latitude)
+    lat_step, lon_step = _cell_degrees(precision)
+
+    prefixes = []
+    for dlat in (-1, 0, 1):
+        lat = min(max(latitude + dlat * lat_step, -90.0), 89.999999)
+        for dlon in (-1, 0, 1):
+            lon = (longitude + dlon * lon_step + 180.0) % 360.0 - 180.0
+            prefix = encode(lat, lon, precision)
+            if prefix not in prefixes:
+                prefixes.append(prefix)
+    return prefixes
@@ -1,13 +1,13 @@
 import logging
 import googlemaps
-import uuid
 from typing import List, Dict, Any, Optional
 from firebase_admin import firestore
 
 from search.base import SearchProvider, SearchResult
-from search.storage import PlaceStorage
+from search.storage import PlaceStorage, extract_coordinates
 from search.cache import PlacesCache
 from search.detail_place import DetailPlace
+from search.place_fields import search_fields
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +15,14 @@ class GooglePlacesSearchProvider(SearchProvider):
     def __init__(self, api_key: str):
         self.client = googlemaps.Client(key=api_key)
         self.cache = PlacesCache()
-        self.storage = PlaceStorage()
+        self.storage = PlaceStorage.get()
         
     def search(self, query: str, limit: int = 10, latitude: float = None, longitude: float = None) -> List[SearchResult]:
         # Check cache first
-        cached_results = self.cache.get(query, latitude, longitude)
+        cached_results = self.cache.get(query, latitude, longitude, limit)
         if cached_results is not None:
             logger.debug("Returning cached results for query: %s", query)
-            return cached_results[:limit]
+            return cached_results
             
         # Get a session token for this search session
         session_token = self.cache.get_session_token()
@@ -61,7 +61,7 @@ class GooglePlacesSearchProvider(SearchProvider):
                         results.append(search_result)
             
             # Cache the results
-            self.cache.set(query, latitude, longitude, results)
+            self.cache.set(query, latitude, longitude, results, limit)
             return results
             
         except Exception as e:
@@ -125,50 +125,32 @@ class GooglePlacesSearchProvider(SearchProvider):
                 logger.info(f"Found existing place with ID: {existing_id}")
                 try:
                     # Get the place from Firestore
-                    places_ref = self.storage.db.collection('places')
+                    places_ref = self.storage.places_ref
                     place_doc = places_ref.document(existing_id).get()
                     
                     if place_doc.exists:
                         place_data = place_doc.to_dict()
-                        # Create a DetailPlace from the Firestore data
-                        return DetailPlace(
-                            id=existing_id,  # Use the existing ID
-                            name=place_data.get('name', ''),
-                            address=place_data.get('address', ''),
-                            city=place_data.get('city', ''),
-                            mapbox_id=place_data.get('mapboxId'),
-                            google_places_id=place_data.get('googlePlacesId'),
-                            coordinate=place_data.get('coordinate'),
-                            categories=place_data.get('categories', []),
-                            phone=place_data.get('phone'),
-                            rating=place_data.get('rating'),
-                            open_hours=place_data.get('openHours', []),
-                            description=place_data.get('description'),
-                            price_level=place_data.get('priceLevel'),
-                            reservable=place_data.get('reservable'),
-                            serves_breakfast=place_data.get('servesBreakfast'),
-                            serves_lunch=place_data.get('servesLunch'),
-                            serves_dinner=place_data.get('servesDinner'),
-                            instagram=place_data.get('instagram'),
-                            twitter=place_data.get('twitter')
-                        )
+                        coordinate = firestore.GeoPoint(*(extract_coordinates(place_data) or (0.0, 0.0)))
+                        # Create a DetailPlace from the Firestore data, keeping the existing ID
+                        return DetailPlace.from_firestore(existing_id, place_data, coordinate)
                 except Exception as e:
                     logger.error(f"Error retrieving existing place from Firestore: {str(e)}")
                     # Continue with creating a new place if there's an error
 
             # If no existing place found or error retrieving it, create a new one
-            # Generate a UUID for the place
-            place_uuid = str(uuid.uuid4()).upper()
+            # under the place's deterministic ID
+            place_uuid = self.storage._doc_id_for(search_result)
             
             # First save to Firestore to get the document ID
-            places_ref = self.storage.db.collection('places')
+            places_ref = self.storage.places_ref
             place_data = {
                 'id': place_uuid,  # Add the UUID as the id field
                 'name': place.get("name", ""),
                 'address': place.get("formatted_address", ""),
                 'city': city,
                 'googlePlacesId': place.get("place_id"),
-                'coordinate': coordinate,
+                'coordinates': {'latitude': location["lat"], 'longitude': location["lng"]},
+                **search_fields(place.get("name", ""), location["lat"], location["lng"]),
                 'categories': place.get("types", []),
                 'phone': place.get("formatted_phone_number"),
                 'rating': place.get("rating"),
@@ -184,7 +166,8 @@ class GooglePlacesSearchProvider(SearchProvider):
             }
             # Create the document with the specific ID
             doc_ref = places_ref.document(place_uuid)
-            doc_ref.set(place_data)
+            doc_ref.set(place_data, merge=True)
+            self.storage._note_spatial_write(place_uuid, location["lat"], location["lng"])
 
             return DetailPlace(
                 id=place_uuid,  # Use the generated UUID
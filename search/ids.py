@@ -0,0 +1,28 @@
+import hashlib
+import uuid
+
+# Sources that refer to the same upstream provider
+_SOURCE_ALIASES = {
+    'google_places': 'google'
+}
+
+def place_doc_id(source: str, place_id: str) -> str:
+    """Build a deterministic Firestore document ID for a provider place.
+
+    The ID is derived from the provider and its place ID, so concurrent writers
+    saving the same place converge on the same document. It keeps the uppercase
+    UUID format used for all place IDs.
+    """
+    source = _SOURCE_ALIASES.get(source, source)
+    digest = hashlib.sha1(f"{source}:{place_id}".encode()).digest()
+    return str(uuid.UUID(bytes=digest[:16], version=5)).upper()
+
+def new_place_id() -> str:
+    """Generate a random place ID in the uppercase dashed UUID format.
+
+    Formats the UUID's integer directly as uppercase hex rather than building
+    the lowercase string and upper-casing it.
+    """
+    n = uuid.uuid4().int
+    return (f"{n >> 96:08X}-{(n >> 80) & 0xFFFF:04X}-{(n >> 64) & 0xFFFF:04X}-"
+            f"{(n >> 48) & 0xFFFF:04X}-{n & 0xFFFFFFFFFFFF:012X}")
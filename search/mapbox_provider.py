@@ -1,14 +1,15 @@
 import logging
+import orjson
 import requests
-import uuid
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from firebase_admin import firestore
 
 from search.base import SearchProvider, SearchResult
-from search.storage import PlaceStorage
+from search.storage import PlaceStorage, extract_coordinates
 from search.cache import PlacesCache
 from search.detail_place import DetailPlace
+from search.place_fields import search_fields
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +17,18 @@ class MapboxSearchProvider(SearchProvider):
     def __init__(self, access_token: str):
         self.access_token = access_token
         self.base_url = "https://api.mapbox.com/search/searchbox/v1"
-        self.storage = PlaceStorage()
-        self.cache = PlacesCache()
+        self.storage = PlaceStorage.get()
+        # Suggestions change rarely, so repeated autocomplete queries skip the API for 10 minutes
+        self.cache = PlacesCache(cache_duration=600)
 
     def search(self, query: str, limit: int = 10, latitude: float = None, longitude: float = None) -> List[SearchResult]:
+        # Check cache first
+        cached_results = self.cache.get(query, latitude, longitude, limit)
+        if cached_results is not None:
+            logger.debug(f"Returning cached Mapbox results for query: {query}")
+            return cached_results
+        search_latitude, search_longitude = latitude, longitude
+        
         params = {
             "access_token": self.access_token,
             "q": query,
@@ -47,7 +56,7 @@ class MapboxSearchProvider(SearchProvider):
                 return []
                 
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Use a dictionary to track unique results by mapbox_id and name+address+coordinates combination
             unique_results = {}
@@ -71,7 +80,7 @@ class MapboxSearchProvider(SearchProvider):
                 latitude = coordinates[1] if coordinates and len(coordinates) > 1 else 0.0
                 
                 # Create a unique key combining name, address, and coordinates
-                place_key = f"{name.lower()}|{full_address.lower()}|{latitude}|{longitude}"
+                place_key = (name.lower(), full_address.lower(), latitude, longitude)
                 
                 # Skip if we've seen this exact place before (by ID or name+address+coordinates)
                 if mapbox_id in unique_results or place_key in seen_places:
@@ -94,6 +103,8 @@ class MapboxSearchProvider(SearchProvider):
             # Convert dictionary values to list
             results = list(unique_results.values())
             
+            # Cache the results
+            self.cache.set(query, search_latitude, search_longitude, results, limit)
             return results
             
         except Exception as e:
@@ -122,7 +133,7 @@ class MapboxSearchProvider(SearchProvider):
             logger.debug(f"Response body: {response.text}")
             
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if not data or "features" not in data or not data["features"]:
                 raise ValueError(f"Place with ID {place_id} not found")
@@ -156,33 +167,14 @@ class MapboxSearchProvider(SearchProvider):
                 logger.info(f"Found existing place with ID: {existing_id}")
                 try:
                     # Get the place from Firestore
-                    places_ref = self.storage.db.collection('places')
+                    places_ref = self.storage.places_ref
                     place_doc = places_ref.document(existing_id).get()
                     
                     if place_doc.exists:
                         place_data = place_doc.to_dict()
-                        # Create a DetailPlace from the Firestore data
-                        return DetailPlace(
-                            id=existing_id,  # Use the existing ID
-                            name=place_data.get('name', ''),
-                            address=place_data.get('address', ''),
-                            city=place_data.get('city', ''),
-                            mapbox_id=place_data.get('mapboxId'),
-                            google_places_id=place_data.get('googlePlacesId'),
-                            coordinate=place_data.get('coordinate'),
-                            categories=place_data.get('categories', []),
-                            phone=place_data.get('phone'),
-                            rating=place_data.get('rating'),
-                            open_hours=place_data.get('openHours', []),
-                            description=place_data.get('description'),
-                            price_level=place_data.get('priceLevel'),
-                            reservable=place_data.get('reservable'),
-                            serves_breakfast=place_data.get('servesBreakfast'),
-                            serves_lunch=place_data.get('servesLunch'),
-                            serves_dinner=place_data.get('servesDinner'),
-                            instagram=place_data.get('instagram'),
-                            twitter=place_data.get('twitter')
-                        )
+                        coordinate = firestore.GeoPoint(*(extract_coordinates(place_data) or (0.0, 0.0)))
+                        # Create a DetailPlace from the Firestore data, keeping the existing ID
+                        return DetailPlace.from_firestore(existing_id, place_data, coordinate)
                 except Exception as e:
                     logger.error(f"Error retrieving existing place from Firestore: {str(e)}")
                     # Continue with creating a new place if there's an error
@@ -215,18 +207,19 @@ class MapboxSearchProvider(SearchProvider):
                 description += f" Located in {neighborhood}."
             
             # If no existing place found or error retrieving it, create a new one
-            # Generate a UUID for the place
-            place_uuid = str(uuid.uuid4()).upper()
+            # under the place's deterministic ID
+            place_uuid = self.storage._doc_id_for(search_result)
             
             # First save to Firestore to get the document ID
-            places_ref = self.storage.db.collection('places')
+            places_ref = self.storage.places_ref
             place_data = {
                 'id': place_uuid,  # Add the UUID as the id field
                 'name': properties.get("name", ""),
                 'address': properties.get("full_address", ""),
                 'city': city,
                 'mapboxId': place_id,
-                'coordinate': coordinate,
+                'coordinates': {'latitude': latitude, 'longitude': longitude},
+                **search_fields(properties.get("name", ""), latitude, longitude),
                 'categories': all_categories,
                 'phone': properties.get("phone"),
                 'rating': properties.get("rating"),
@@ -242,7 +235,8 @@ class MapboxSearchProvider(SearchProvider):
             }
             # Create the document with the specific ID
             doc_ref = places_ref.document(place_uuid)
-            doc_ref.set(place_data)
+            doc_ref.set(place_data, merge=True)
+            self.storage._note_spatial_write(place_uuid, latitude, longitude)
 
             return DetailPlace(
                 id=place_uuid,  # Use the generated UUID
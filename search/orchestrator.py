@@ -1,49 +1,111 @@
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 from search.base import SearchProvider, SearchResult
-from search.whoosh_provider import WhooshSearchProvider
+from search.whoosh_provider import WhooshSearchProvider, normalized_name_address
 from search.mapbox_provider import MapboxSearchProvider
 from search.google_provider import GooglePlacesSearchProvider
 
 logger = logging.getLogger(__name__)
 
 class SearchOrchestrator:
+    # Threads shared by all requests for the remote provider calls
+    MAX_WORKERS = 8
+    # Seconds to wait for a remote provider before searching without it
+    PROVIDER_TIMEOUT = 5
+    # Combined results reused for identical searches within the TTL (seconds)
+    RESULT_CACHE_TTL = 60
+    RESULT_CACHE_SIZE = 1024
+
     def __init__(self, whoosh_provider: WhooshSearchProvider,
                  mapbox_provider: MapboxSearchProvider,
                  google_places_provider: GooglePlacesSearchProvider):
         self.whoosh_provider = whoosh_provider
         self.mapbox_provider = mapbox_provider
         self.google_places_provider = google_places_provider
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="search-provider")
+        self._result_cache: 'OrderedDict[tuple, Tuple[float, Tuple[SearchResult, ...]]]' = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        # Searches currently running, shared with identical concurrent requests
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
 
     def _is_same_place(self, place1: SearchResult, place2: SearchResult) -> bool:
         """Check if two places are likely the same based on name, address, and coordinates."""
-        # Normalize names and addresses for comparison
-        name1 = place1.name.lower().strip()
-        name2 = place2.name.lower().strip()
+        # Cheapest filter first: coordinates must be very close (within ~100 meters)
+        if abs(place1.latitude - place2.latitude) >= 0.001 or abs(place1.longitude - place2.longitude) >= 0.001:
+            return False
         
-        # If names are exactly the same
-        if name1 == name2:
-            # Check if addresses are exactly the same after normalization
-            addr1 = place1.address.lower().strip()
-            addr2 = place2.address.lower().strip()
-            
-            # Remove common variations
-            for suffix in [', usa', ', united states', ', ut', ', utah']:
-                addr1 = addr1.replace(suffix, '')
-                addr2 = addr2.replace(suffix, '')
-            
-            # If addresses are exactly the same after normalization
-            if addr1 == addr2:
-                # Check if coordinates are very close (within ~100 meters)
-                lat_diff = abs(place1.latitude - place2.latitude)
-                lon_diff = abs(place1.longitude - place2.longitude)
-                if lat_diff < 0.001 and lon_diff < 0.001:  # Approximately 100 meters
-                    return True
-                
-        return False
+        # Names and addresses must match after normalization
+        name1, addr1 = normalized_name_address(place1)
+        name2, addr2 = normalized_name_address(place2)
+        return name1 == name2 and addr1 == addr2
+
+    def _provider_results(self, future: Future, provider_name: str) -> List[SearchResult]:
+        """Wait for a remote provider search, treating failures as no results."""
+        try:
+            return future.result(timeout=self.PROVIDER_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error searching {provider_name}: {str(e)}")
+            return []
+
+    def _cached_results(self, key: tuple) -> Optional[List[SearchResult]]:
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                cached_at, results = cached
+                if time.monotonic() - cached_at < self.RESULT_CACHE_TTL:
+                    self._result_cache.move_to_end(key)
+                    return list(results)
+                del self._result_cache[key]
+        return None
+
+    def _cache_results(self, key: tuple, results: List[SearchResult]) -> None:
+        with self._result_cache_lock:
+            self._result_cache[key] = (time.monotonic(), tuple(results))
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
+    def search(self, query: str, limit: int = 10, latitude: Optional[float] = None, longitude: Optional[float] = None) -> List[SearchResult]:
+        """Search all providers, sharing results between identical concurrent or recent searches."""
+        # Coordinates are rounded to ~10 m so nearby repeat searches share an entry
+        key = (
+            query.lower().strip(), limit,
+            round(latitude, 4) if latitude is not None else None,
+            round(longitude, 4) if longitude is not None else None
+        )
+        cached_results = self._cached_results(key)
+        if cached_results is not None:
+            return cached_results
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        # Another request is already running this search; wait for its results
+        if not is_leader:
+            return list(future.result())
+
+        try:
+            results = self._search_providers(query, limit, latitude, longitude)
+            self._cache_results(key, results)
+            future.set_result(tuple(results))
+            return results
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
 
-    def search(self, query: str, limit: int = 10, latitude: float = None, longitude: float = None) -> List[SearchResult]:
+    def _search_providers(self, query: str, limit: int, latitude: Optional[float], longitude: Optional[float]) -> List[SearchResult]:
         # Try Whoosh first
         whoosh_results = self.whoosh_provider.search(query, limit)
         
@@ -51,8 +113,11 @@ class SearchOrchestrator:
         if len(whoosh_results) >= 5:
             return whoosh_results
             
-        # If we have fewer than 5 results, try Mapbox
-        mapbox_results = self.mapbox_provider.search(query, limit - len(whoosh_results), latitude, longitude)
+        # If we have fewer than 5 results, query Mapbox and Google Places concurrently
+        remaining = limit - len(whoosh_results)
+        mapbox_future = self._pool.submit(self.mapbox_provider.search, query, remaining, latitude, longitude)
+        google_future = self._pool.submit(self.google_places_provider.search, query, remaining, latitude, longitude)
+        mapbox_results = self._provider_results(mapbox_future, "Mapbox")
         
         # Combine results from both providers with deduplication
         combined_results = whoosh_results.copy()
@@ -62,10 +127,12 @@ class SearchOrchestrator:
             if not is_duplicate:
                 combined_results.append(mapbox_result)
         
-        # If we still don't have enough results, try Google Places
+        # If we still don't have enough results, fill in from Google Places
         if len(combined_results) < 5:
-            google_results = self.google_places_provider.search(query, limit - len(combined_results), latitude, longitude)
+            google_results = self._provider_results(google_future, "Google Places")
             for google_result in google_results:
+                if len(combined_results) >= limit:
+                    break
                 # Check if this result is a duplicate
                 is_duplicate = any(self._is_same_place(google_result, existing) for existing in combined_results)
                 if not is_duplicate:
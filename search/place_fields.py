@@ -0,0 +1,41 @@
+import functools
+import re
+from typing import List, Optional
+
+from search import geohash
+
+_WS_RE = re.compile(r'\s+')
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_name_impl(name: str) -> str:
+    """Lowercase and collapse whitespace, memoized since chain names repeat heavily."""
+    return _WS_RE.sub(' ', name.strip().lower())
+
+def normalize_name(name: Optional[str]) -> str:
+    """Normalize a place name for comparison by removing extra spaces and converting to lowercase."""
+    return _normalize_name_impl(name) if name else ""
+
+def name_trigrams(normalized_name: str) -> List[str]:
+    """Distinct character trigrams of a normalized name, used as a blocking key for name matching."""
+    return sorted({normalized_name[i:i + 3] for i in range(len(normalized_name) - 2)})
+
+def coordinate_fields(latitude: float, longitude: float) -> dict:
+    """Compact integer microdegree encoding of a coordinate (~0.1m precision),
+    plus the geohash used for range queries on place location."""
+    return {
+        'lat_e6': round(latitude * 1e6),
+        'lon_e6': round(longitude * 1e6),
+        'geohash': geohash.encode(latitude, longitude, precision=9)
+    }
+
+def search_fields(name: Optional[str], latitude: Optional[float], longitude: Optional[float]) -> dict:
+    """Derived fields every place document needs so the name and location
+    lookups in PlaceStorage can find it. Include them in every write of a place."""
+    normalized_name = normalize_name(name)
+    fields = {
+        'normalized_name': normalized_name,
+        'name_trigrams': name_trigrams(normalized_name)
+    }
+    if latitude is not None and longitude is not None:
+        fields.update(coordinate_fields(latitude, longitude))
+    return fields
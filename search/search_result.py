@@ -1,18 +1,17 @@
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 
+@dataclass(frozen=True, slots=True)
 class SearchResult:
-    def __init__(self, 
-                 name: str,
-                 address: str,
-                 latitude: float,
-                 longitude: float,
-                 place_id: str,
-                 source: str,
-                 additional_data: Dict[str, Any] = None):
-        self.name = name
-        self.address = address
-        self.latitude = latitude
-        self.longitude = longitude
-        self.place_id = place_id
-        self.source = source
-        self.additional_data = additional_data or {} 
\ No newline at end of file
+    name: str
+    address: str
+    latitude: float
+    longitude: float
+    place_id: str
+    source: str
+    # Provider-specific extras, not part of a result's identity
+    additional_data: Optional[Dict[str, Any]] = field(default=None, compare=False)
+
+    def __post_init__(self):
+        if self.additional_data is None:
+            object.__setattr__(self, 'additional_data', {})
@@ -1,28 +1,222 @@
 import os
 import json
 import logging
-import uuid
+import asyncio
+import weakref
 import firebase_admin
 from firebase_admin import credentials, firestore
-from typing import Optional, List
+from typing import Optional, List, ClassVar
 import math
+import random
+import functools
+import itertools
+import threading
+import time
+import numpy as np
+import msgpack
+from concurrent.futures import ThreadPoolExecutor
+from google.api_core.exceptions import Aborted, DeadlineExceeded, ServiceUnavailable
+from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions, SendMode
 
 from search.base import SearchResult
+from search.ids import place_doc_id, new_place_id
+from search import geohash
+from search.place_fields import normalize_name, name_trigrams, coordinate_fields, search_fields
 
 logger = logging.getLogger(__name__)
 
-# Custom JSON encoder to handle Firestore GeoPoint objects
-class FirestoreEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, firestore.GeoPoint):
-            return {
-                'latitude': obj.latitude,
-                'longitude': obj.longitude
-            }
-        return super().default(obj)
+# Stored fields that find_nearby_places doesn't pass through in additional_data
+_NEARBY_EXCLUDE = frozenset({
+    'name', 'address', 'coordinate', 'coordinates', 'lat_e6', 'lon_e6', 'geohash',
+    'normalized_name', 'name_trigrams', 'place_id', 'source', 'googlePlacesId', 'mapboxId', 'packed'
+})
+
+@functools.lru_cache(maxsize=4)
+def _parse_credentials(firebase_creds: str) -> dict:
+    """Parse the FIREBASE_CREDENTIALS JSON, cached on the raw env var content."""
+    return json.loads(firebase_creds)
+
+def extract_coordinates(place_data: dict) -> Optional[tuple]:
+    """Get (latitude, longitude) from a place document, or None if it has no coordinates."""
+    lat_e6 = place_data.get('lat_e6')
+    lon_e6 = place_data.get('lon_e6')
+    if lat_e6 is not None and lon_e6 is not None:
+        return lat_e6 / 1e6, lon_e6 / 1e6
+    
+    coordinates = place_data.get('coordinates')
+    if coordinates:
+        return coordinates.get('latitude', 0), coordinates.get('longitude', 0)
+    
+    # Legacy GeoPoint field, until migrate_coordinates has moved it to 'coordinates'
+    coordinate = place_data.get('coordinate')
+    if coordinate is not None and hasattr(coordinate, 'latitude'):
+        return coordinate.latitude, coordinate.longitude
+    
+    return None
+
+_sin, _cos, _atan2, _sqrt, _radians = math.sin, math.cos, math.atan2, math.sqrt, math.radians
+
+# Below this many candidates the scalar formula beats NumPy's per-call overhead
+_VECTORIZE_MIN_CANDIDATES = 16
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float, radius: float = 6371000) -> float:
+    """Scalar Haversine distance in the units of radius (meters by default).
+    Uses the atan2 form, which stays accurate for near-antipodal points."""
+    lat1r = _radians(lat1)
+    lat2r = _radians(lat2)
+    sin_dlat = _sin((lat2r - lat1r) * 0.5)
+    sin_dlon = _sin(_radians(lon2 - lon1) * 0.5)
+    a = sin_dlat * sin_dlat + _cos(lat1r) * _cos(lat2r) * sin_dlon * sin_dlon
+    return 2 * radius * _atan2(_sqrt(a), _sqrt(1 - a))
+
+def _bounding_box(latitude: float, radius_meters: float) -> tuple:
+    """Half-widths (max_dlat, max_dlon) in degrees of a box that contains the
+    circle of radius_meters around a point at the given latitude."""
+    max_dlat = math.degrees(radius_meters / 6371000)
+    # Use the box edge furthest from the equator, where longitude degrees are shortest
+    cos_lat = _cos(_radians(min(abs(latitude) + max_dlat, 90.0)))
+    max_dlon = 180.0 if cos_lat < 1e-9 else min(180.0, max_dlat / cos_lat)
+    return max_dlat, max_dlon
+
+def _in_bounding_box(latitude: float, longitude: float, place_lat: float, place_lon: float, box: tuple) -> bool:
+    """Cheap envelope check run before the Haversine formula."""
+    dlon = abs(place_lon - longitude)
+    return abs(place_lat - latitude) <= box[0] and min(dlon, 360.0 - dlon) <= box[1]
+
+def _haversine_distances(latitude: float, longitude: float, lats, lons, radius: float = 6371000) -> np.ndarray:
+    """Vectorized Haversine distance from one point to arrays of points.
+    Distances are in the units of radius (meters by default)."""
+    lat1 = math.radians(latitude)
+    lon1 = math.radians(longitude)
+    lats = np.deg2rad(np.asarray(lats, dtype=np.float64))
+    lons = np.deg2rad(np.asarray(lons, dtype=np.float64))
+    a = np.sin((lats - lat1) * 0.5) ** 2 + math.cos(lat1) * np.cos(lats) * np.sin((lons - lon1) * 0.5) ** 2
+    return 2 * radius * np.arcsin(np.sqrt(a))
+
+def _tiktok_video_update(tiktok_videos: list) -> dict:
+    """Build a server-side ArrayUnion update appending TikTok videos to a place.
+    
+    Videos repeated in the input are collapsed by video_id. The tiktok_video_ids
+    field is kept in step so places can be matched on video ID alone.
+    """
+    videos = list({video.get('video_id'): video for video in tiktok_videos}.values())
+    return {
+        'tiktok_videos': firestore.ArrayUnion(videos),
+        'tiktok_video_ids': firestore.ArrayUnion([video.get('video_id') for video in videos])
+    }
+
+def pack_extra(extra: dict) -> bytes:
+    """Pack rarely-queried place fields into a compact MessagePack blob for the 'packed' field."""
+    return msgpack.packb(extra, use_bin_type=True, default=str)
+
+def unpack_extra(place_data: dict) -> dict:
+    """Unpack the 'packed' field of a place document, or {} if it has none."""
+    packed = place_data.get('packed')
+    return msgpack.unpackb(packed, raw=False) if packed else {}
+
+@firestore.transactional
+def _append_new_tiktok_videos(transaction, place_ref, tiktok_videos: list) -> int:
+    """Append the TikTok videos whose video_id isn't stored on the place yet,
+    reading and updating in one transaction. Returns the number appended."""
+    snapshot = place_ref.get(field_paths=['tiktok_video_ids'], transaction=transaction)
+    if not snapshot.exists:
+        return 0
+    existing_ids = snapshot.to_dict().get('tiktok_video_ids')
+    if existing_ids is None:
+        # Places saved before tiktok_video_ids existed only have the videos themselves
+        snapshot = place_ref.get(field_paths=['tiktok_videos'], transaction=transaction)
+        existing_ids = [video.get('video_id') for video in snapshot.to_dict().get('tiktok_videos') or ()]
+    
+    existing_ids = set(existing_ids)
+    # Collapse videos repeated in the input by video_id as well
+    new_videos = list({
+        video.get('video_id'): video for video in tiktok_videos
+        if video.get('video_id') not in existing_ids
+    }.values())
+    if new_videos:
+        transaction.update(place_ref, _tiktok_video_update(new_videos))
+    return len(new_videos)
+
+def _first_match(query, transaction=None):
+    """Return the first document matching a query, or None, reading at most one document."""
+    return next(iter(query.limit(1).stream(transaction=transaction)), None)
+
+@firestore.transactional
+def _create_place_if_absent(transaction, storage, place: SearchResult, place_data: dict) -> tuple:
+    """Check for an existing place and create it in a single transaction.
+    Returns (document_id, created)."""
+    existing_id = storage._check_for_duplicate(place, transaction=transaction)
+    if existing_id:
+        return existing_id, False
+    
+    doc_ref = storage.places_ref.document(place_data['id'])
+    transaction.set(doc_ref, place_data)
+    return place_data['id'], True
 
 class PlaceStorage:
+    # Shared instance returned by PlaceStorage.get()
+    _instance: ClassVar[Optional['PlaceStorage']] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    # Limits for the async bulk save path
+    ASYNC_CONCURRENCY = 40
+    WRITE_BATCH_SIZE = 500
+    # Worker threads shared by parallel queries and duplicate checks
+    POOL_SIZE = 40
+    # Attempts for failed bulk writes and transient errors in paginated scans
+    WRITE_RETRIES = 5
+    # WriteBatch commits in flight at once in save_places_batch
+    BATCH_CONCURRENCY = 8
+    # Starting rate for BulkWriter, which ramps up from here (500/50/5 rule)
+    BULK_WRITER_OPS_PER_SECOND = 500
+    # Page size for full-collection scans
+    PAGE_SIZE = 500
+    # Most values Firestore accepts in one array_contains_any filter
+    ARRAY_CONTAINS_ANY_LIMIT = 10
+    # Seconds before the in-memory spatial index is rebuilt from Firestore
+    SPATIAL_INDEX_TTL = 300
+    # Seconds before retrying a spatial index build that failed
+    SPATIAL_RETRY_DELAY = 30
+    # Seconds trigger_whoosh_reindex waits for the fallback indexer
+    REINDEX_TIMEOUT = 600
+    # Marker document written once backfill_geohashes has covered every place
+    MARKER_COLLECTION = 'meta'
+    SEARCH_FIELDS_MARKER = 'place_search_fields'
+    # Seconds between reads of the marker while it is still missing
+    MARKER_CHECK_INTERVAL = 300
+    # Places scanned by the name and location lookup until the backfill has run
+    FALLBACK_SCAN_LIMIT = 1000
+
     def __init__(self):
+        # Reference to the places collection, None when Firestore isn't available
+        self.places_ref = None
+        # AsyncClients are bound to the event loop they were created on
+        self._async_dbs = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        # Worker pool for fanning out independent Firestore queries and writes
+        self._pool = ThreadPoolExecutor(max_workers=self.POOL_SIZE)
+        
+        # In-memory spatial index for find_nearby_places: place IDs and
+        # coordinates sorted by latitude, plus places written since the last build
+        self._spatial_lock = threading.Lock()
+        # Held while the index is being rebuilt, so only one scan runs at a time
+        self._spatial_rebuild_lock = threading.Lock()
+        self._spatial_ids = np.empty(0, dtype=object)
+        self._spatial_lats = np.empty(0, dtype=np.float64)
+        self._spatial_lons = np.empty(0, dtype=np.float64)
+        self._spatial_pending = {}
+        self._spatial_built_at = None
+        # Set once every stored place is known to have the search fields
+        self._search_fields_ready = False
+        self._search_fields_checked_at = None
+        # Local search provider that incremental_reindex updates, set with set_search_index
+        self._search_index = None
+        # Weak references to callbacks run with the ID of each place written,
+        # so caches of place documents can drop stale entries
+        self._write_listeners = []
+        self._write_listeners_lock = threading.Lock()
+        
         # Initialize Firestore if not already initialized
         if not firebase_admin._apps:
             try:
@@ -34,22 +228,13 @@ class PlaceStorage:
                     return
                 
                 try:
-                    # Parse the JSON string from environment variable
-                    cred_dict = json.loads(firebase_creds)
-                    
-                    # Create a temporary credentials file
-                    temp_cred_path = 'temp_credentials.json'
-                    with open(temp_cred_path, 'w') as f:
-                        json.dump(cred_dict, f)
-                    
-                    # Initialize Firebase with the temporary file
-                    cred = credentials.Certificate(temp_cred_path)
+                    # Parse the JSON string from environment variable and
+                    # initialize Firebase directly from the parsed dict
+                    cred = credentials.Certificate(_parse_credentials(firebase_creds))
                     firebase_admin.initialize_app(cred)
                     
-                    # Remove the temporary file
-                    os.remove(temp_cred_path)
-                    
                     self.db = firestore.client()
+                    self.places_ref = self.db.collection('places')
                     logger.info("Firebase initialized successfully")
                 except json.JSONDecodeError:
                     logger.error("Failed to parse Firebase credentials JSON")
@@ -63,180 +248,547 @@ class PlaceStorage:
         else:
             try:
                 self.db = firestore.client()
+                self.places_ref = self.db.collection('places')
                 logger.info("Using existing Firebase instance")
             except Exception as e:
                 logger.error(f"Error getting Firestore client: {str(e)}")
                 self.db = None
 
+    @classmethod
+    def get(cls) -> 'PlaceStorage':
+        """Get the process-wide PlaceStorage, creating it on first use.
+        
+        Sharing one instance shares its Firestore client (and gRPC channels),
+        thread pool and spatial index across all request handlers.
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _build_google_place_data(self, place: SearchResult) -> dict:
+        """Build the Firestore document for a Google Places result."""
+        # Extract Google Places specific data
+        additional_data = place.additional_data or {}
+        
+        # Convert place to dictionary matching DetailPlace structure
+        return {
+            'id': self._doc_id_for(place),  # Deterministic uppercase UUID for this Google place
+            'name': place.name,
+            'address': place.address,
+            'city': additional_data.get('city', ""),  # Get city from additional_data, default to empty string if None
+            'mapboxId': None,  # Google Places don't have Mapbox ID
+            'googlePlacesId': place.place_id,  # Store the Google Places specific ID
+            'coordinates': {'latitude': place.latitude, 'longitude': place.longitude},
+            **search_fields(place.name, place.latitude, place.longitude),
+            'categories': additional_data.get('types'),  # Google Places uses 'types' for categories
+            'phone': additional_data.get('formatted_phone_number'),
+            'rating': additional_data.get('rating'),
+            'openHours': additional_data.get('opening_hours', {}).get('weekday_text'),
+            'description': additional_data.get('formatted_address'),
+            'priceLevel': str(additional_data.get('price_level')) if additional_data.get('price_level') is not None else None,
+            'reservable': additional_data.get('reservable'),
+            'servesBreakfast': None,  # Not provided by Google Places
+            'servesLunch': None,     # Not provided by Google Places
+            'servesDinner': None,    # Not provided by Google Places
+            'instagram': None,        # Not provided by Google Places
+            'twitter': None           # Not provided by Google Places
+        }
+
     def _save_google_place(self, place: SearchResult) -> str:
         """Save a Google Places result to Firestore."""
         try:
-            # Extract Google Places specific data
-            additional_data = place.additional_data or {}
+            # Without Firestore there is nothing to save, so skip building the document
+            if self.db is None:
+                return self._doc_id_for(place)
             
-            # Convert place to dictionary matching DetailPlace structure
-            place_data = {
-                'id': str(uuid.uuid4()).upper(),  # Format UUID in uppercase with hyphens
-                'name': place.name,
-                'address': place.address,
-                'city': additional_data.get('city', ""),  # Get city from additional_data, default to empty string if None
-                'mapboxId': None,  # Google Places don't have Mapbox ID
-                'googlePlacesId': place.place_id,  # Store the Google Places specific ID
-                'coordinate': firestore.GeoPoint(place.latitude, place.longitude),
-                'categories': additional_data.get('types'),  # Google Places uses 'types' for categories
-                'phone': additional_data.get('formatted_phone_number'),
-                'rating': additional_data.get('rating'),
-                'openHours': additional_data.get('opening_hours', {}).get('weekday_text'),
-                'description': additional_data.get('formatted_address'),
-                'priceLevel': str(additional_data.get('price_level')) if additional_data.get('price_level') is not None else None,
-                'reservable': additional_data.get('reservable'),
-                'servesBreakfast': None,  # Not provided by Google Places
-                'servesLunch': None,     # Not provided by Google Places
-                'servesDinner': None,    # Not provided by Google Places
-                'instagram': None,        # Not provided by Google Places
-                'twitter': None           # Not provided by Google Places
-            }
+            place_data = self._build_google_place_data(place)
             
-            # Save to Firestore
-            if hasattr(self, 'db'):
-                places_ref = self.db.collection('places')
-                doc_ref = places_ref.add(place_data)
-                return doc_ref[1].id
-            else:
-                return place_data['id']
+            # Check for the place under legacy IDs or by name and proximity, and
+            # insert it under the deterministic ID, in a single transaction
+            doc_id, created = _create_place_if_absent(self.db.transaction(), self, place, place_data)
+            if created:
+                self._note_spatial_write(doc_id, place.latitude, place.longitude)
+            return doc_id
                 
         except Exception as e:
             logger.error(f"Error processing Google Place: {str(e)}")
             return f"dummy_id_{place.place_id}"
 
+    def _build_mapbox_place_data(self, place: SearchResult) -> dict:
+        """Build the Firestore document for a Mapbox result."""
+        # Extract Mapbox specific data
+        additional_data = place.additional_data or {}
+        
+        # Convert place to dictionary matching DetailPlace structure
+        return {
+            'id': self._doc_id_for(place),  # Deterministic uppercase UUID for this Mapbox place
+            'name': place.name,
+            'address': place.address,
+            'city': additional_data.get('city'),
+            'mapboxId': place.place_id,  # Mapbox places have Mapbox ID
+            'googlePlacesId': None,  # Mapbox places don't have Google Places ID
+            'coordinates': {'latitude': place.latitude, 'longitude': place.longitude},
+            **search_fields(place.name, place.latitude, place.longitude),
+            'categories': additional_data.get('categories'),
+            'phone': additional_data.get('phone'),
+            'rating': additional_data.get('rating'),
+            'openHours': additional_data.get('openHours'),
+            'description': additional_data.get('description'),
+            'priceLevel': additional_data.get('priceLevel'),
+            'reservable': additional_data.get('reservable'),
+            'servesBreakfast': additional_data.get('servesBreakfast'),
+            'servesLunch': additional_data.get('servesLunch'),
+            'servesDinner': additional_data.get('servesDinner'),
+            'instagram': additional_data.get('instagram'),
+            'twitter': additional_data.get('twitter')
+        }
+
     def _save_mapbox_place(self, place: SearchResult) -> str:
         """Save a Mapbox result to Firestore."""
         try:
-            # Extract Mapbox specific data
-            additional_data = place.additional_data or {}
+            # Without Firestore there is nothing to save, so skip building the document
+            if self.db is None:
+                return self._doc_id_for(place)
             
-            # Convert place to dictionary matching DetailPlace structure
-            place_data = {
-                'id': str(uuid.uuid4()).upper(),  # Format UUID in uppercase with hyphens
-                'name': place.name,
-                'address': place.address,
-                'city': additional_data.get('city'),
-                'mapboxId': place.place_id,  # Mapbox places have Mapbox ID
-                'googlePlacesId': None,  # Mapbox places don't have Google Places ID
-                'coordinate': firestore.GeoPoint(place.latitude, place.longitude),
-                'categories': additional_data.get('categories'),
-                'phone': additional_data.get('phone'),
-                'rating': additional_data.get('rating'),
-                'openHours': additional_data.get('openHours'),
-                'description': additional_data.get('description'),
-                'priceLevel': additional_data.get('priceLevel'),
-                'reservable': additional_data.get('reservable'),
-                'servesBreakfast': additional_data.get('servesBreakfast'),
-                'servesLunch': additional_data.get('servesLunch'),
-                'servesDinner': additional_data.get('servesDinner'),
-                'instagram': additional_data.get('instagram'),
-                'twitter': additional_data.get('twitter')
-            }
+            place_data = self._build_mapbox_place_data(place)
             
-            # Save to Firestore
-            if hasattr(self, 'db'):
-                places_ref = self.db.collection('places')
-                doc_ref = places_ref.add(place_data)
-                return doc_ref[1].id
-            else:
-                return place_data['id']
+            # Check for the place under legacy IDs or by name and proximity, and
+            # insert it under the deterministic ID, in a single transaction
+            doc_id, created = _create_place_if_absent(self.db.transaction(), self, place, place_data)
+            if created:
+                self._note_spatial_write(doc_id, place.latitude, place.longitude)
+            return doc_id
             
         except Exception as e:
             logger.error(f"Error processing Mapbox Place: {str(e)}")
             return f"dummy_id_{place.place_id}"
         
+    def _doc_id_for(self, place: SearchResult) -> str:
+        """Get the Firestore document ID to use for a new place.
+        Provider places get a deterministic ID, everything else a random UUID."""
+        if place.place_id and place.source in ['google', 'google_places', 'mapbox']:
+            return place_doc_id(place.source, place.place_id)
+        return new_place_id()
+
     def _normalize_string(self, s: str) -> str:
         """Normalize a string for comparison by removing extra spaces and converting to lowercase."""
-        if not s:
-            return ""
-        return " ".join(s.lower().split())
+        return normalize_name(s)
 
-    def _check_for_duplicate(self, place: SearchResult) -> Optional[str]:
+    def _check_for_duplicate(self, place: SearchResult, transaction=None) -> Optional[str]:
         """Check if a place already exists in the database.
-        Returns the existing place's ID if found, None otherwise."""
+        Returns the existing place's ID if found, None otherwise.
+        
+        When a transaction is given, all reads are made as part of it."""
         try:
-            if not hasattr(self, 'db'):
+            if self.db is None:
                 return None
                 
-            places_ref = self.db.collection('places')
+            places_ref = self.places_ref
             
             # First check by place_id if available
             if place.place_id:
-                # Check for Google Places ID
-                if place.source in ['google', 'google_places']:
-                    existing_places = places_ref.where('google_place_id', '==', place.place_id).get()
-                    if existing_places:
-                        # Always return uppercase ID for consistency
-                        return existing_places[0].id.upper() if existing_places[0].id else existing_places[0].id
-                
-                # Check for Mapbox ID
-                elif place.source == 'mapbox':
-                    existing_places = places_ref.where('mapbox_id', '==', place.place_id).get()
-                    if existing_places:
-                        # Always return uppercase ID for consistency
-                        return existing_places[0].id.upper() if existing_places[0].id else existing_places[0].id
+                existing_id = self.check_duplicates_bulk([place], transaction=transaction).get(place.place_id)
+                if existing_id:
+                    return existing_id
             
             # If no match by ID, check by name and proximity
-            normalized_name = self._normalize_string(place.name)
-            
             # Get all places with the same name
-            places_with_same_name = places_ref.where('name', '==', place.name).get()
+            places_with_same_name = places_ref.where('name', '==', place.name).get(transaction=transaction)
             
             # Check each place with the same name for proximity
-            for doc in places_with_same_name:
-                doc_data = doc.to_dict()
-                
-                # Handle both new and old coordinate formats
-                coordinates = doc_data.get('coordinates')
-                if coordinates and isinstance(coordinates, dict):
-                    lat2, lon2 = coordinates.get('latitude', 0), coordinates.get('longitude', 0)
-                else:
-                    doc_coordinate = doc_data.get('coordinate')
-                    if doc_coordinate and hasattr(doc_coordinate, 'latitude'):
-                        lat2, lon2 = doc_coordinate.latitude, doc_coordinate.longitude
-                    else:
-                        continue
-                
-                # Calculate distance between coordinates (in feet)
-                lat1, lon1 = place.latitude, place.longitude
-                
-                # Convert to radians
-                lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-                
-                # Haversine formula
-                dlat = lat2 - lat1
-                dlon = lon2 - lon1
-                a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-                c = 2 * math.asin(math.sqrt(a))
-                r = 20902231  # Radius of earth in feet
-                distance = c * r
-                
-                # If within 100 feet, it's a duplicate
-                if distance <= 100:
-                    logger.info(f"Found duplicate place by name and proximity: {place.name}")
-                    # Always return uppercase ID for consistency
-                    return doc.id.upper() if doc.id else doc.id
+            return self._find_duplicate_by_proximity(place, places_with_same_name)
             
-            # No match found
+        except Exception as e:
+            logger.error(f"Error checking for duplicates: {str(e)}")
+            return None
+
+    def check_duplicates_bulk(self, places: List[SearchResult], transaction=None) -> dict:
+        """Look up existing documents for many provider places at once.
+        
+        Deterministic document IDs are fetched with a single get_all call, and
+        places not found that way are matched against the legacy
+        google_place_id / mapbox_id fields with one 'in' query per 10 IDs.
+        Returns a dict of {place_id: document_id} for the places that exist.
+        """
+        if self.db is None:
+            return {}
+        
+        places_ref = self.places_ref
+        provider_places = [
+            place for place in places
+            if place.place_id and place.source in ['google', 'google_places', 'mapbox']
+        ]
+        
+        # Provider places are stored under a deterministic document ID
+        refs = {}
+        for place in provider_places:
+            refs[place_doc_id(place.source, place.place_id)] = place.place_id
+        
+        found = {}
+        if refs:
+            for doc in self.db.get_all([places_ref.document(doc_id) for doc_id in refs], transaction=transaction):
+                if doc.exists:
+                    found[refs[doc.id]] = doc.id
+        
+        # Fall back to the legacy ID fields for places saved before deterministic IDs
+        legacy_ids = {'google_place_id': [], 'mapbox_id': []}
+        for place in provider_places:
+            if place.place_id in found:
+                continue
+            field = 'mapbox_id' if place.source == 'mapbox' else 'google_place_id'
+            legacy_ids[field].append(place.place_id)
+        
+        queries = [
+            (field, places_ref.where(field, 'in', ids[i:i + 10]))
+            for field, ids in legacy_ids.items()
+            for i in range(0, len(ids), 10)
+        ]
+        
+        def run(field_query):
+            field, query = field_query
+            return [(doc.get(field), doc.id) for doc in query.stream(transaction=transaction)]
+        
+        # Transactional reads stay on the calling thread
+        if transaction is not None or len(queries) < 2:
+            results = map(run, queries)
+        else:
+            results = self._pool.map(run, queries)
+        
+        for matches in results:
+            for place_id, doc_id in matches:
+                # Always return uppercase ID for consistency
+                found.setdefault(place_id, doc_id.upper() if doc_id else doc_id)
+        
+        return found
+
+    def _find_duplicate_by_proximity(self, place: SearchResult, candidates) -> Optional[str]:
+        """Return the ID of the first candidate document within 100 feet of the place."""
+        docs = []
+        lats = []
+        lons = []
+        box = _bounding_box(place.latitude, 30.48)  # 100 feet
+        for doc in candidates:
+            doc_coordinates = extract_coordinates(doc.to_dict())
+            if doc_coordinates is None:
+                continue
+            if not _in_bounding_box(place.latitude, place.longitude, doc_coordinates[0], doc_coordinates[1], box):
+                continue
+            docs.append(doc)
+            lats.append(doc_coordinates[0])
+            lons.append(doc_coordinates[1])
+        
+        if not docs:
             return None
+        
+        # Distances to every candidate (in feet), in one vectorized Haversine
+        # pass unless there are only a few candidates
+        if len(docs) < _VECTORIZE_MIN_CANDIDATES:
+            distances = np.array([
+                _haversine(place.latitude, place.longitude, lat, lon, radius=20902231)
+                for lat, lon in zip(lats, lons)
+            ])
+        else:
+            distances = _haversine_distances(place.latitude, place.longitude, lats, lons, radius=20902231)
+        
+        # If within 100 feet, it's a duplicate
+        matches = np.flatnonzero(distances <= 100)
+        if matches.size:
+            doc = docs[matches[0]]
+            logger.info(f"Found duplicate place by name and proximity: {place.name}")
+            # Always return uppercase ID for consistency
+            return doc.id.upper() if doc.id else doc.id
+        
+        return None
+
+    def _get_async_db(self):
+        """Get a Firestore AsyncClient for the running event loop, sharing the Firebase app's credentials."""
+        loop = asyncio.get_running_loop()
+        async_db = self._async_dbs.get(loop)
+        if async_db is None:
+            app = firebase_admin.get_app()
+            async_db = firestore.AsyncClient(
+                project=app.project_id,
+                credentials=app.credential.get_credential()
+            )
+            self._async_dbs[loop] = async_db
+        return async_db
+
+    def _get_loop(self):
+        """Get the event loop running on a dedicated background thread, starting it if needed."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='place-storage-loop', daemon=True).start()
+        return self._loop
+
+    async def _check_for_duplicate_async(self, place: SearchResult) -> Optional[str]:
+        """Async version of _check_for_duplicate using the Firestore AsyncClient.
+        
+        The ID and name lookups run concurrently and the first positive result wins.
+        """
+        try:
+            places_ref = self._get_async_db().collection('places')
+            
+            async def by_document_id():
+                doc = await places_ref.document(place_doc_id(place.source, place.place_id)).get()
+                return doc.id if doc.exists else None
+            
+            async def by_legacy_id(field):
+                async for doc in places_ref.where(field, '==', place.place_id).limit(1).stream():
+                    return doc.id.upper() if doc.id else doc.id
+                return None
+            
+            async def by_name_and_proximity():
+                places_with_same_name = await places_ref.where('name', '==', place.name).get()
+                return self._find_duplicate_by_proximity(place, places_with_same_name)
+            
+            lookups = [by_name_and_proximity()]
+            if place.place_id:
+                if place.source in ['google', 'google_places', 'mapbox']:
+                    lookups.append(by_document_id())
+                if place.source in ['google', 'google_places']:
+                    lookups.append(by_legacy_id('google_place_id'))
+                elif place.source == 'mapbox':
+                    lookups.append(by_legacy_id('mapbox_id'))
+            
+            pending = {asyncio.ensure_future(lookup) for lookup in lookups}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is not None:
+                            logger.error(f"Duplicate lookup failed: {str(task.exception())}")
+                            continue
+                        existing_id = task.result()
+                        if existing_id:
+                            return existing_id
+                return None
+            finally:
+                for task in pending:
+                    task.cancel()
             
         except Exception as e:
             logger.error(f"Error checking for duplicates: {str(e)}")
             return None
 
+    def check_for_duplicate_concurrent(self, place: SearchResult) -> Optional[str]:
+        """Blocking wrapper running _check_for_duplicate_async on the background event loop.
+        Safe to call from worker threads."""
+        future = asyncio.run_coroutine_threadsafe(self._check_for_duplicate_async(place), self._get_loop())
+        return future.result()
+
+    async def save_places_async(self, places: List[SearchResult]) -> List[Optional[str]]:
+        """Save many places concurrently using the Firestore AsyncClient.
+        
+        Duplicate checks run concurrently, then new places are written with
+        batched commits. Returns the document ID for each input place, or None
+        for places with an unsupported source.
+        """
+        if self.db is None:
+            logger.error("Firestore database not initialized")
+            return [None] * len(places)
+        
+        # Bound the number of in-flight RPCs to avoid DEADLINE_EXCEEDED
+        semaphore = asyncio.Semaphore(self.ASYNC_CONCURRENCY)
+        
+        async def check(place):
+            async with semaphore:
+                return await self._check_for_duplicate_async(place)
+        
+        existing_ids = await asyncio.gather(*(check(place) for place in places))
+        
+        # Build documents for the places that aren't stored yet
+        place_ids = list(existing_ids)
+        new_docs = []
+        for i, place in enumerate(places):
+            if place_ids[i]:
+                continue
+            if place.source in ['google', 'google_places']:
+                place_data = self._build_google_place_data(place)
+            elif place.source == 'mapbox':
+                place_data = self._build_mapbox_place_data(place)
+            else:
+                logger.warning(f"Unknown source: {place.source}, skipping save")
+                continue
+            place_ids[i] = place_data['id']
+            new_docs.append(place_data)
+        
+        # Write in batches, committing the batches concurrently
+        async_db = self._get_async_db()
+        places_ref = async_db.collection('places')
+        
+        async def commit(chunk):
+            batch = async_db.batch()
+            for place_data in chunk:
+                batch.set(places_ref.document(place_data['id']), place_data, merge=True)
+            async with semaphore:
+                await batch.commit()
+            for place_data in chunk:
+                self._note_spatial_write(place_data['id'], *extract_coordinates(place_data))
+        
+        await asyncio.gather(*(
+            commit(new_docs[i:i + self.WRITE_BATCH_SIZE])
+            for i in range(0, len(new_docs), self.WRITE_BATCH_SIZE)
+        ))
+        
+        logger.info(f"Saved {len(new_docs)} new places, {len(places) - len(new_docs)} already existed or were skipped")
+        return place_ids
+
+    def _bulk_writer(self, failed: set):
+        """Create a parallel BulkWriter that records the IDs of documents whose writes finally fail."""
+        bulk_writer = self.db.bulk_writer(options=BulkWriterOptions(
+            mode=SendMode.parallel,
+            initial_ops_per_second=self.BULK_WRITER_OPS_PER_SECOND
+        ))
+        
+        def on_write_error(error, bulk_writer) -> bool:
+            # Returning True retries the write with backoff
+            if error.attempts < self.WRITE_RETRIES:
+                return True
+            # BulkWriteFailure has no reference of its own; it's on the failed operation
+            doc_id = error.operation.reference.id
+            failed.add(doc_id)
+            logger.error(f"Failed to write document {doc_id}: {error.message}")
+            return False
+        
+        bulk_writer.on_write_error(on_write_error)
+        return bulk_writer
+
+    def save_places_bulk(self, places: List[SearchResult]) -> List[Optional[str]]:
+        """Save many places using a Firestore BulkWriter.
+        
+        Existing places are found with concurrent lookups on the thread pool,
+        then new places are written under their client-side IDs by a BulkWriter,
+        which handles parallelism, rate ramp-up and retries. Returns the document
+        ID for each input place, or None for places with an unsupported source
+        or a failed write.
+        """
+        if self.db is None:
+            logger.error("Firestore database not initialized")
+            return [None] * len(places)
+        
+        existing_ids = list(self._pool.map(self.check_for_duplicate_concurrent, places))
+        
+        place_ids = [None] * len(places)
+        new_docs = {}
+        for i, place in enumerate(places):
+            if existing_ids[i]:
+                place_ids[i] = existing_ids[i]
+                continue
+            if place.source in ['google', 'google_places']:
+                place_data = self._build_google_place_data(place)
+            elif place.source == 'mapbox':
+                place_data = self._build_mapbox_place_data(place)
+            else:
+                logger.warning(f"Unknown source: {place.source}, skipping save")
+                continue
+            new_docs[i] = place_data
+        
+        failed = set()
+        bulk_writer = self._bulk_writer(failed)
+        places_ref = self.places_ref
+        for place_data in new_docs.values():
+            # merge keeps concurrent saves of the same deterministic ID idempotent
+            bulk_writer.set(places_ref.document(place_data['id']), place_data, merge=True)
+        bulk_writer.close()
+        
+        for i, place_data in new_docs.items():
+            if place_data['id'] not in failed:
+                place_ids[i] = place_data['id']
+                self._note_spatial_write(place_data['id'], *extract_coordinates(place_data))
+        
+        logger.info(f"Saved {len(new_docs) - len(failed)} new places, {sum(1 for place_id in existing_ids if place_id)} already existed")
+        return place_ids
+
+    def _commit_batch(self, chunk: List[dict], semaphore: threading.Semaphore):
+        """Commit one WriteBatch of place documents, retrying aborted commits with jittered backoff."""
+        for attempt in range(self.WRITE_RETRIES):
+            # A batch can't be committed twice, so rebuild it on each attempt
+            batch = self.db.batch()
+            for place_data in chunk:
+                batch.set(self.places_ref.document(place_data['id']), place_data, merge=True)
+            try:
+                with semaphore:
+                    batch.commit()
+                return
+            except (Aborted, DeadlineExceeded) as e:
+                if attempt == self.WRITE_RETRIES - 1:
+                    raise
+                delay = (2 ** attempt) * 0.1 + random.uniform(0, 0.1)
+                logger.warning(f"Retrying batch of {len(chunk)} places in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+
+    def save_places_batch(self, places: List[SearchResult]) -> List[Optional[str]]:
+        """Save many places with atomic WriteBatch commits of up to WRITE_BATCH_SIZE documents.
+        
+        Each chunk is written all-or-nothing. Chunks are committed on the thread
+        pool, at most BATCH_CONCURRENCY at a time. Returns the document ID for
+        each input place, or None for places with an unsupported source or
+        whose batch failed. Use save_places_bulk when atomicity isn't needed.
+        """
+        if self.db is None:
+            logger.error("Firestore database not initialized")
+            return [None] * len(places)
+        
+        place_ids = [None] * len(places)
+        new_docs = []
+        for i, place in enumerate(places):
+            if place.source in ['google', 'google_places']:
+                place_data = self._build_google_place_data(place)
+            elif place.source == 'mapbox':
+                place_data = self._build_mapbox_place_data(place)
+            else:
+                logger.warning(f"Unknown source: {place.source}, skipping save")
+                continue
+            new_docs.append((i, place_data))
+        
+        semaphore = threading.Semaphore(self.BATCH_CONCURRENCY)
+        chunks = [new_docs[i:i + self.WRITE_BATCH_SIZE] for i in range(0, len(new_docs), self.WRITE_BATCH_SIZE)]
+        futures = [
+            self._pool.submit(self._commit_batch, [place_data for _, place_data in chunk], semaphore)
+            for chunk in chunks
+        ]
+        
+        for chunk, future in zip(chunks, futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error committing batch of {len(chunk)} places: {str(e)}")
+                continue
+            for i, place_data in chunk:
+                place_ids[i] = place_data['id']
+                self._note_spatial_write(place_data['id'], *extract_coordinates(place_data))
+        
+        logger.info(f"Saved {sum(1 for place_id in place_ids if place_id)} of {len(places)} places in {len(chunks)} batches")
+        return place_ids
+
+    def append_tiktok_videos_bulk(self, videos_by_place: dict):
+        """Append TikTok videos to many existing places.
+        
+        videos_by_place maps place document IDs to lists of video dicts. Each
+        place is updated in its own transaction on the thread pool, skipping
+        videos already stored under the same video_id.
+        """
+        if self.db is None:
+            return
+        
+        try:
+            appends = [(place_id, tiktok_videos) for place_id, tiktok_videos in videos_by_place.items() if tiktok_videos]
+            appended = list(self._pool.map(lambda append: self._append_tiktok_videos_to_place(*append), appends))
+            logger.info(f"Appended TikTok videos to {sum(1 for count in appended if count)} places")
+        except Exception as e:
+            logger.error(f"Error appending TikTok videos to places: {str(e)}")
+
     def check_for_existing_place_by_tiktok_url(self, tiktok_url: str) -> Optional[str]:
         """Check if a place already exists with the given TikTok URL.
         Returns the existing place's ID if found, None otherwise."""
         try:
-            if not hasattr(self, 'db') or not self.db:
+            if self.db is None:
                 return None
                 
-            places_ref = self.db.collection('places')
+            places_ref = self.places_ref
             
             # Get all places that have tiktok_videos
             places_with_videos = places_ref.where('tiktok_videos', '>', []).get()
@@ -262,50 +814,49 @@ class PlaceStorage:
         """Check if a place already exists with similar name and location.
         Returns the existing place's ID if found, None otherwise."""
         try:
-            if not hasattr(self, 'db') or not self.db:
+            if self.db is None:
                 return None
-                
-            places_ref = self.db.collection('places')
             
             # Normalize the search name
             normalized_search_name = self._normalize_string(name)
             
-            # Get all places and check for similar names and proximity
-            # Note: In production, consider using a more efficient query
-            all_places = places_ref.limit(1000).get()
+            if self._search_fields_backfilled():
+                candidates = self._name_and_location_candidates(normalized_search_name, latitude, longitude)
+            else:
+                # Places saved before the search fields existed can't be found by
+                # the indexed queries, so scan places as before until the backfill has run
+                candidates = itertools.islice(
+                    self.iter_places(fields=['name', 'normalized_name', 'lat_e6', 'lon_e6', 'coordinates', 'coordinate']),
+                    self.FALLBACK_SCAN_LIMIT
+                )
             
-            for doc in all_places:
+            box = _bounding_box(latitude, 500)
+            for doc in candidates:
                 place_data = doc.to_dict()
-                place_name = place_data.get('name', '')
-                normalized_place_name = self._normalize_string(place_name)
+                normalized_place_name = place_data.get('normalized_name') or self._normalize_string(place_data.get('name', ''))
                 
                 # Check for similar names (exact match or contains)
                 name_match = (normalized_search_name == normalized_place_name or 
                              normalized_search_name in normalized_place_name or
                              normalized_place_name in normalized_search_name)
+                if not name_match:
+                    continue
                 
-                if name_match:
-                    # Check proximity
-                    coordinates = place_data.get('coordinates')
-                    if coordinates and isinstance(coordinates, dict):
-                        place_lat = coordinates.get('latitude', 0)
-                        place_lon = coordinates.get('longitude', 0)
-                    else:
-                        doc_coordinate = place_data.get('coordinate')
-                        if doc_coordinate and hasattr(doc_coordinate, 'latitude'):
-                            place_lat = doc_coordinate.latitude
-                            place_lon = doc_coordinate.longitude
-                        else:
-                            continue
-                    
-                    # Calculate distance
-                    distance = self._calculate_distance(latitude, longitude, place_lat, place_lon)
-                    
-                    # If within 500 meters (broader than the 100 feet used elsewhere)
-                    if distance <= 500:
-                        logger.info(f"Found existing place by name similarity and proximity: {place_name}")
-                        # Always return uppercase ID for consistency
-                        return doc.id.upper() if doc.id else doc.id
+                place_coordinates = extract_coordinates(place_data)
+                if place_coordinates is None:
+                    continue
+                place_lat, place_lon = place_coordinates
+                if not _in_bounding_box(latitude, longitude, place_lat, place_lon, box):
+                    continue
+                
+                # Calculate distance
+                distance = self._calculate_distance(latitude, longitude, place_lat, place_lon)
+                
+                # If within 500 meters (broader than the 100 feet used elsewhere)
+                if distance <= 500:
+                    logger.info(f"Found existing place by name similarity and proximity: {place_data.get('name', '')}")
+                    # Always return uppercase ID for consistency
+                    return doc.id.upper() if doc.id else doc.id
             
             return None
             
@@ -313,62 +864,102 @@ class PlaceStorage:
             logger.error(f"Error checking for existing place by name and location: {str(e)}")
             return None
 
-    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Calculate distance between two points in meters using Haversine formula"""
-        # Convert latitude and longitude from degrees to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    def _name_and_location_candidates(self, normalized_search_name: str, latitude: float, longitude: float) -> list:
+        """Fetch places that may match a name within 500 meters, using the
+        name_trigrams/normalized_name + geohash composite indexes."""
+        places_ref = self.places_ref
         
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
+        # Block on every trigram of the name, so both stored names containing
+        # the search name and stored names contained in it share at least one.
+        # Names too short to have trigrams fall back to an exact match, and
+        # stored names shorter than 3 characters are only found that way.
+        search_trigrams = name_trigrams(normalized_search_name)
+        if search_trigrams:
+            name_queries = [
+                places_ref.where('name_trigrams', 'array_contains_any', search_trigrams[i:i + self.ARRAY_CONTAINS_ANY_LIMIT])
+                for i in range(0, len(search_trigrams), self.ARRAY_CONTAINS_ANY_LIMIT)
+            ]
+        else:
+            name_queries = [places_ref.where('normalized_name', '==', normalized_search_name)]
         
-        # Radius of Earth in meters
-        r = 6371000
+        # Restrict to the geohash cells covering 500 meters
+        queries = [
+            name_query.order_by('geohash').start_at([prefix]).end_at([prefix + '\uf8ff'])
+            for name_query in name_queries
+            for prefix in geohash.cover(latitude, longitude, 500)
+        ]
         
-        return c * r
+        # A place sharing trigrams from several chunks is returned more than once
+        candidates = {}
+        for docs in self._pool.map(lambda q: list(q.stream()), queries):
+            for doc in docs:
+                candidates.setdefault(doc.id, doc)
+        return list(candidates.values())
+
+    def _search_fields_backfilled(self) -> bool:
+        """Whether backfill_geohashes has completed, so every place has the
+        fields the indexed name and location lookups query on.
+        
+        A found marker is remembered for the life of the process; a missing one
+        is read again at most every MARKER_CHECK_INTERVAL seconds."""
+        if self._search_fields_ready:
+            return True
+        checked_at = self._search_fields_checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.MARKER_CHECK_INTERVAL:
+            return False
+        marker = self.db.collection(self.MARKER_COLLECTION).document(self.SEARCH_FIELDS_MARKER).get()
+        self._search_fields_ready = marker.exists
+        self._search_fields_checked_at = time.monotonic()
+        return self._search_fields_ready
+
+    def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        """Calculate distance between two points in meters using Haversine formula"""
+        return _haversine(lat1, lon1, lat2, lon2)
 
     def find_nearby_places(self, latitude: float, longitude: float, radius_meters: int = 50, limit: int = 20) -> List[SearchResult]:
         """Find places within the specified radius of the given coordinates"""
         try:
-            places_ref = self.db.collection('places')
+            if self.db is None:
+                return []
             
-            # Get all places (we'll filter by distance since Firestore geo queries are complex)
-            # For better performance in production, consider using Firestore geo queries or a spatial index
-            all_places = places_ref.limit(1000).get()  # Limit to prevent excessive reads
+            # Nearest hits from the in-memory spatial index, then fetch only those documents
+            hits = self._spatial_query(latitude, longitude, radius_meters)[:limit]
+            if not hits:
+                return []
+            
+            places_ref = self.places_ref
+            distances = dict(hits)
+            docs = self.db.get_all([places_ref.document(doc_id) for doc_id, _ in hits])
             
             nearby_places = []
             
-            for doc in all_places:
+            for doc in docs:
+                if not doc.exists:
+                    continue
                 place_data = doc.to_dict()
-                coordinate = place_data.get('coordinate')
+                place_lat, place_lng = extract_coordinates(place_data) or (0.0, 0.0)
+                distance = distances[doc.id]
                 
-                if coordinate:
-                    place_lat = coordinate.latitude
-                    place_lng = coordinate.longitude
-                    
-                    # Calculate distance
-                    distance = self._calculate_distance(latitude, longitude, place_lat, place_lng)
-                    
-                    if distance <= radius_meters:
-                        # Convert back to SearchResult
-                        search_result = SearchResult(
-                            name=place_data.get('name', ''),
-                            address=place_data.get('address', ''),
-                            latitude=place_lat,
-                            longitude=place_lng,
-                            place_id=doc.id,  # Use Firestore document ID for consistency
-                            source=place_data.get('source', 'firestore'),
-                            additional_data={
-                                'firestore_id': doc.id,
-                                'distance_meters': round(distance, 2),
-                                'googlePlacesId': place_data.get('googlePlacesId'),
-                                'mapboxId': place_data.get('mapboxId'),
-                                **{k: v for k, v in place_data.items() if k not in ['name', 'address', 'coordinate', 'place_id', 'source', 'googlePlacesId', 'mapboxId']}
-                            }
-                        )
-                        nearby_places.append(search_result)
+                additional_data = {
+                    'firestore_id': doc.id,
+                    'distance_meters': round(distance, 2),
+                    'googlePlacesId': place_data.get('googlePlacesId'),
+                    'mapboxId': place_data.get('mapboxId')
+                }
+                additional_data.update({k: place_data[k] for k in place_data.keys() - _NEARBY_EXCLUDE})
+                additional_data.update(unpack_extra(place_data))
+                
+                # Convert back to SearchResult
+                search_result = SearchResult(
+                    name=place_data.get('name', ''),
+                    address=place_data.get('address', ''),
+                    latitude=place_lat,
+                    longitude=place_lng,
+                    place_id=doc.id,  # Use Firestore document ID for consistency
+                    source=place_data.get('source', 'firestore'),
+                    additional_data=additional_data
+                )
+                nearby_places.append(search_result)
             
             # Sort by distance and limit results
             nearby_places.sort(key=lambda x: x.additional_data.get('distance_meters', 0))
@@ -378,37 +969,150 @@ class PlaceStorage:
             logger.error(f"Error finding nearby places in Firestore: {str(e)}")
             return []
 
+    def _spatial_index_stale(self) -> bool:
+        """Whether the spatial index has never been built or is older than SPATIAL_INDEX_TTL."""
+        built_at = self._spatial_built_at
+        return built_at is None or time.monotonic() - built_at > self.SPATIAL_INDEX_TTL
+
+    def _refresh_spatial_index(self, wait: bool = False):
+        """Rebuild the spatial index if it is stale, unless another thread already is.
+        With wait, block until a rebuild in progress finishes instead of returning."""
+        if not self._spatial_rebuild_lock.acquire(blocking=wait):
+            return
+        try:
+            # Another thread may have rebuilt the index while this one waited
+            if not self._spatial_index_stale():
+                return
+            self._build_spatial_index()
+        except Exception as e:
+            logger.error(f"Error building spatial index: {str(e)}")
+            # Keep serving the current snapshot and retry after a delay,
+            # rather than rescanning the collection on every request
+            self._spatial_built_at = time.monotonic() - self.SPATIAL_INDEX_TTL + self.SPATIAL_RETRY_DELAY
+        finally:
+            self._spatial_rebuild_lock.release()
+
+    def _build_spatial_index(self):
+        """Build the in-memory spatial index from a snapshot of the places collection."""
+        # Writes noted before the scan starts are covered by the snapshot
+        with self._spatial_lock:
+            covered = set(self._spatial_pending)
+        
+        ids = []
+        lats = []
+        lons = []
+        for doc in self.iter_places(fields=['lat_e6', 'lon_e6', 'coordinates', 'coordinate']):
+            place_data = doc.to_dict()
+            coordinates = extract_coordinates(place_data)
+            if coordinates:
+                ids.append(doc.id)
+                lats.append(coordinates[0])
+                lons.append(coordinates[1])
+        
+        # Sort by latitude so a query only scans the band within its radius
+        lats = np.asarray(lats, dtype=np.float64)
+        order = np.argsort(lats, kind='stable')
+        with self._spatial_lock:
+            self._spatial_ids = np.asarray(ids, dtype=object)[order]
+            self._spatial_lats = lats[order]
+            self._spatial_lons = np.asarray(lons, dtype=np.float64)[order]
+            for doc_id in covered:
+                self._spatial_pending.pop(doc_id, None)
+            self._spatial_built_at = time.monotonic()
+        logger.info(f"Built spatial index with {len(ids)} places")
+
+    def add_write_listener(self, callback):
+        """Register a bound method to be called with the ID of every place written
+        through PlaceStorage. Only a weak reference is kept, so registering doesn't
+        keep the listener's object alive."""
+        with self._write_listeners_lock:
+            self._write_listeners.append(weakref.WeakMethod(callback))
+
+    def _note_place_write(self, doc_id: str):
+        """Tell the write listeners that a place document has changed."""
+        with self._write_listeners_lock:
+            self._write_listeners = [ref for ref in self._write_listeners if ref() is not None]
+            listeners = [ref() for ref in self._write_listeners]
+        for listener in listeners:
+            if listener is not None:
+                listener(doc_id)
+
+    def _note_spatial_write(self, doc_id: str, latitude: float, longitude: float):
+        """Make a newly written place visible to the spatial index before the next
+        rebuild, and to the write listeners."""
+        self._note_place_write(doc_id)
+        if latitude is None or longitude is None:
+            return
+        with self._spatial_lock:
+            self._spatial_pending[doc_id] = (latitude, longitude)
+
+    def _spatial_query(self, latitude: float, longitude: float, radius_meters: float) -> List[tuple]:
+        """Return (place_id, distance_meters) pairs within the radius, nearest first."""
+        if self._spatial_built_at is None:
+            # Nothing to serve yet, so wait for the first build
+            self._refresh_spatial_index(wait=True)
+        elif self._spatial_index_stale():
+            # Serve the current snapshot while it is rebuilt in the background
+            self._pool.submit(self._refresh_spatial_index)
+        
+        with self._spatial_lock:
+            ids, lats, lons = self._spatial_ids, self._spatial_lats, self._spatial_lons
+            pending = list(self._spatial_pending.items())
+        
+        # Only places in the latitude band of the radius can match
+        max_dlat, max_dlon = box = _bounding_box(latitude, radius_meters)
+        lo = np.searchsorted(lats, latitude - max_dlat, side='left')
+        hi = np.searchsorted(lats, latitude + max_dlat, side='right')
+        
+        # Within the band, reject places outside the longitude envelope before Haversine
+        band_dlon = np.abs(lons[lo:hi] - longitude)
+        in_box = lo + np.flatnonzero(np.minimum(band_dlon, 360.0 - band_dlon) <= max_dlon)
+        distances = _haversine_distances(latitude, longitude, lats[in_box], lons[in_box])
+        
+        hits = {ids[in_box[i]]: float(distances[i]) for i in np.flatnonzero(distances <= radius_meters)}
+        for doc_id, (place_lat, place_lon) in pending:
+            if not _in_bounding_box(latitude, longitude, place_lat, place_lon, box):
+                continue
+            distance = self._calculate_distance(latitude, longitude, place_lat, place_lon)
+            if distance <= radius_meters:
+                hits[doc_id] = distance
+        
+        return sorted(hits.items(), key=lambda hit: hit[1])
+
     def save_place(self, place: SearchResult) -> str:
         """Save a place to Firestore and return its ID."""
         try:
             # Check if place already exists
-            places_ref = self.db.collection('places')
-            existing_places = places_ref.where('place_id', '==', place.place_id).get()
+            places_ref = self.places_ref
+            existing_place = _first_match(places_ref.where('place_id', '==', place.place_id))
             
-            if existing_places:
+            if existing_place:
                 # Place already exists, return its ID
-                return existing_places[0].id
+                return existing_place.id
                 
             # Create new place document
             place_data = {
                 'name': place.name,
                 'address': place.address,
-                'coordinate': firestore.GeoPoint(place.latitude, place.longitude),
+                'coordinates': {'latitude': place.latitude, 'longitude': place.longitude},
+                **search_fields(place.name, place.latitude, place.longitude),
                 'place_id': place.place_id,
                 'source': place.source,
                 'created_at': firestore.SERVER_TIMESTAMP,
                 'updated_at': firestore.SERVER_TIMESTAMP
             }
             
-            # Add any additional data
+            # Pack any additional data into one binary field; it's only read back
+            # whole, so it doesn't need to be individually queryable
             if place.additional_data:
                 # Filter out internal fields that shouldn't be stored
                 filtered_data = {k: v for k, v in place.additional_data.items() 
                                if k not in ['firestore_id', 'distance_meters']}
-                place_data.update(filtered_data)
+                place_data['packed'] = pack_extra(filtered_data)
                 
             # Save to Firestore
             doc_ref = places_ref.add(place_data)
+            self._note_spatial_write(doc_ref[1].id, place.latitude, place.longitude)
             return doc_ref[1].id  # Return the document ID
             
         except Exception as e:
@@ -418,11 +1122,7 @@ class PlaceStorage:
     def save_place_old(self, place: SearchResult) -> str:
         """Save a place to Firestore based on its source."""
         try:
-            # Check for existing place first
-            existing_id = self._check_for_duplicate(place)
-            if existing_id:
-                return existing_id
-                
+            # Provider places are checked for duplicates inside the save transaction
             if place.source in ['google', 'google_places']:
                 place_id = self._save_google_place(place)
                 return place_id
@@ -430,6 +1130,9 @@ class PlaceStorage:
                 place_id = self._save_mapbox_place(place)
                 return place_id
             else:
+                existing_id = self._check_for_duplicate(place)
+                if existing_id:
+                    return existing_id
                 logger.warning(f"Unknown source: {place.source}, skipping save")
                 return f"dummy_id_{place.place_id}"
         except Exception as e:
@@ -447,20 +1150,12 @@ class PlaceStorage:
             str: Document ID of the saved place or None on error
         """
         try:
-            if not hasattr(self, 'db') or not self.db:
+            if self.db is None:
                 logger.error("Firestore database not initialized")
                 return None
                 
-            # Check for duplicates first
-            existing_id = self._check_for_duplicate(place)
-            if existing_id:
-                # If place exists and we have TikTok videos, append them
-                if tiktok_videos:
-                    self._append_tiktok_videos_to_place(existing_id, tiktok_videos)
-                return existing_id
-            
             # Generate UUID for the place - MUST BE UPPERCASE
-            place_uuid = str(uuid.uuid4()).upper()
+            place_uuid = self._doc_id_for(place)
             
             # Extract additional data
             additional_data = place.additional_data or {}
@@ -475,6 +1170,7 @@ class PlaceStorage:
                     'latitude': place.latitude,
                     'longitude': place.longitude
                 },
+                **search_fields(place.name, place.latitude, place.longitude),
                 'categories': additional_data.get('categories', []) or additional_data.get('types', []),
                 'created_at': firestore.SERVER_TIMESTAMP,
                 'source': place.source
@@ -489,6 +1185,7 @@ class PlaceStorage:
             # Add TikTok videos if provided
             if tiktok_videos:
                 place_data['tiktok_videos'] = tiktok_videos
+                place_data['tiktok_video_ids'] = [video.get('video_id') for video in tiktok_videos]
             
             # Add other optional fields
             if additional_data.get('phone'):
@@ -498,42 +1195,45 @@ class PlaceStorage:
             if additional_data.get('description'):
                 place_data['description'] = additional_data['description']
                 
-            # Save to Firestore using the UUID as document ID
-            places_ref = self.db.collection('places')
-            doc_ref = places_ref.document(place_uuid)
-            doc_ref.set(place_data)
+            # Check for duplicates and save in one transaction so concurrent
+            # writers can't both miss the check and insert the same place
+            doc_id, created = _create_place_if_absent(self.db.transaction(), self, place, place_data)
+            if not created:
+                # If place exists and we have TikTok videos, append them
+                if tiktok_videos:
+                    self._append_tiktok_videos_to_place(doc_id, tiktok_videos)
+                return doc_id
             
+            self._note_spatial_write(place_uuid, place.latitude, place.longitude)
             logger.info(f"Saved place {place.name} with ID {place_uuid}")
+            
+            # Index the new place in the background once it is committed
+            self._pool.submit(self.incremental_reindex, [place_uuid])
             return place_uuid
             
         except Exception as e:
             logger.error(f"Error saving place with TikTok data: {str(e)}")
             return None
 
-    def _append_tiktok_videos_to_place(self, place_id: str, tiktok_videos: list):
-        """Append TikTok videos to an existing place."""
+    def _append_tiktok_videos_to_place(self, place_id: str, tiktok_videos: list) -> int:
+        """Append TikTok videos to an existing place, skipping any whose video_id
+        is already stored. Returns the number of videos added.
+        
+        Only the stored video IDs are read, and the check and the ArrayUnion
+        append run in one transaction, so concurrent appends of the same video
+        can't both add it.
+        """
         try:
-            place_ref = self.db.collection('places').document(place_id)
-            place_doc = place_ref.get()
-            
-            if place_doc.exists:
-                place_data = place_doc.to_dict()
-                existing_videos = place_data.get('tiktok_videos', [])
-                
-                # Get existing video IDs to avoid duplicates
-                existing_video_ids = {video.get('video_id') for video in existing_videos}
-                
-                # Add new videos that don't already exist
-                new_videos = [video for video in tiktok_videos 
-                             if video.get('video_id') not in existing_video_ids]
-                
-                if new_videos:
-                    updated_videos = existing_videos + new_videos
-                    place_ref.update({'tiktok_videos': updated_videos})
-                    logger.info(f"Added {len(new_videos)} new TikTok videos to place {place_id}")
+            place_ref = self.places_ref.document(place_id)
+            added = _append_new_tiktok_videos(self.db.transaction(), place_ref, tiktok_videos)
+            if added:
+                self._note_place_write(place_id)
+            logger.info(f"Added {added} new TikTok videos to place {place_id}")
+            return added
                 
         except Exception as e:
             logger.error(f"Error appending TikTok videos to place: {str(e)}")
+            return 0
 
     def add_place_to_user_external_places(self, user_id: str, place: SearchResult, tiktok_videos: list = None) -> tuple:
         """Add a place to a user's externalPlaces subcollection and save to main places collection.
@@ -547,7 +1247,7 @@ class PlaceStorage:
             tuple: (place_id, external_place_doc_id) or (None, None) on error
         """
         try:
-            if not hasattr(self, 'db') or not self.db:
+            if self.db is None:
                 logger.error("Firestore database not initialized")
                 return None, None
                 
@@ -576,10 +1276,10 @@ class PlaceStorage:
             }
             
             # Check if place already exists in user's external places
-            existing_external = external_places_ref.where('placeId', '==', place_doc_id).get()
+            existing_external = _first_match(external_places_ref.where('placeId', '==', place_doc_id))
             if existing_external:
                 logger.info(f"Place {place_doc_id} already exists in user {user_id}'s externalPlaces")
-                return place_doc_id, existing_external[0].id
+                return place_doc_id, existing_external.id
             
             # Add to externalPlaces
             doc_ref = external_places_ref.add(external_place_data)
@@ -592,11 +1292,150 @@ class PlaceStorage:
             logger.error(f"Error adding place to user's externalPlaces: {str(e)}")
             return None, None
 
+    def iter_places(self, page_size: int = None, fields: List[str] = None):
+        """Stream every place document in pages ordered by document ID.
+        
+        Only one page is held in memory at a time. If a page fails with a
+        transient error, the scan resumes after the last document yielded.
+        Pass fields to fetch only those fields of each document.
+        """
+        page_size = page_size or self.PAGE_SIZE
+        base_query = self.places_ref
+        if fields:
+            base_query = base_query.select(fields)
+        base_query = base_query.order_by('__name__').limit(page_size)
+        cursor = None
+        retries = 0
+        
+        while True:
+            query = base_query.start_after(cursor) if cursor is not None else base_query
+            count = 0
+            try:
+                for doc in query.stream():
+                    count += 1
+                    cursor = doc
+                    yield doc
+            except (Aborted, DeadlineExceeded, ServiceUnavailable) as e:
+                retries += 1
+                if retries > self.WRITE_RETRIES:
+                    raise
+                logger.warning(f"Resuming place scan after {cursor.id if cursor else 'start'}: {str(e)}")
+                time.sleep((2 ** retries) * 0.1)
+                continue
+            
+            retries = 0
+            if count < page_size:
+                return
+
+    def backfill_geohashes(self) -> int:
+        """Add the geohash, normalized_name and name_trigrams fields to places
+        saved before they existed. Returns the number updated."""
+        if self.db is None:
+            return 0
+
+        updated = 0
+        try:
+            for doc in self.iter_places():
+                place_data = doc.to_dict()
+                if place_data.get('geohash') and 'name_trigrams' in place_data:
+                    continue
+                coordinates = extract_coordinates(place_data)
+                if coordinates:
+                    doc.reference.update(search_fields(place_data.get('name', ''), *coordinates))
+                    updated += 1
+            logger.info(f"Backfilled geohash on {updated} places")
+            
+            # Switch the name and location lookups over to the indexed queries
+            self.db.collection(self.MARKER_COLLECTION).document(self.SEARCH_FIELDS_MARKER).set({
+                'completed_at': firestore.SERVER_TIMESTAMP
+            })
+            self._search_fields_ready = True
+        except Exception as e:
+            logger.error(f"Error backfilling geohashes: {str(e)}")
+        return updated
+
+    def _whoosh_place(self, place_doc) -> SearchResult:
+        """Convert a Firestore place document to the SearchResult stored in the Whoosh index."""
+        place_data = place_doc.to_dict()
+        
+        # Extract coordinates (handles all stored formats)
+        latitude, longitude = extract_coordinates(place_data) or (0.0, 0.0)
+        
+        # IMPORTANT: Ensure place_id is uppercase for consistency
+        return SearchResult(
+            name=place_data.get('name', ''),
+            address=place_data.get('address', ''),
+            latitude=latitude,
+            longitude=longitude,
+            place_id=place_doc.id.upper() if place_doc.id else place_doc.id,
+            source='firestore'
+        )
+
+    def set_search_index(self, provider):
+        """Use the local search provider serving the app (Whoosh or FTS5) for
+        incremental_reindex, so saved places go to its index and share its writer lock."""
+        self._search_index = provider
+
+    def incremental_reindex(self, place_ids: List[str]) -> int:
+        """Add or update only the given places in the local search index.
+        Returns the number of places indexed."""
+        if self.db is None or not place_ids:
+            return 0
+        
+        search_index = self._search_index
+        if search_index is None:
+            logger.warning(f"No local search index registered, {len(place_ids)} places not indexed")
+            return 0
+        
+        try:
+            places_ref = self.places_ref
+            places = [
+                self._whoosh_place(doc)
+                for doc in self.db.get_all([places_ref.document(place_id) for place_id in place_ids])
+                if doc.exists
+            ]
+            
+            indexed = search_index.update_places(places)
+            logger.info(f"Incrementally indexed {indexed} places")
+            return indexed
+        except Exception as e:
+            logger.error(f"Error updating local search index for places {place_ids}: {str(e)}")
+            return 0
+
+    def migrate_coordinates(self) -> int:
+        """One-off migration of places still storing a GeoPoint 'coordinate' field
+        to the 'coordinates' dict. Returns the number of places migrated."""
+        if self.db is None:
+            return 0
+        
+        migrated = 0
+        try:
+            failed = set()
+            bulk_writer = self._bulk_writer(failed)
+            for doc in self.iter_places(fields=['coordinate']):
+                coordinate = doc.to_dict().get('coordinate')
+                if coordinate is None:
+                    continue
+                bulk_writer.update(doc.reference, {
+                    'coordinates': {'latitude': coordinate.latitude, 'longitude': coordinate.longitude},
+                    **coordinate_fields(coordinate.latitude, coordinate.longitude),
+                    'coordinate': firestore.DELETE_FIELD
+                })
+                self._note_place_write(doc.id)
+                migrated += 1
+            bulk_writer.close()
+            migrated -= len(failed)
+            logger.info(f"Migrated coordinates on {migrated} places")
+        except Exception as e:
+            logger.error(f"Error migrating place coordinates: {str(e)}")
+        return migrated
+
     def trigger_whoosh_reindex(self):
-        """Trigger a Whoosh index rebuild to include new places.
+        """Rebuild the whole Whoosh index from Firestore.
         
-        Note: This requires the Whoosh provider to be initialized and available.
-        In a production environment, consider using a background task queue.
+        Saved places are indexed incrementally by incremental_reindex, so this is
+        only needed for recovery or schema changes. It requires the Whoosh
+        provider to be initialized and available.
         """
         try:
             from search.whoosh_provider import WhooshSearchProvider
@@ -609,41 +1448,14 @@ class PlaceStorage:
             logger.info("Whoosh index cleared")
             
             # Get all places from Firestore and index them
-            if hasattr(self, 'db') and self.db:
-                places_ref = self.db.collection('places')
-                places = places_ref.get()
-                
-                # Index each place
-                with whoosh_provider.ix.writer() as writer:
-                    for place_doc in places:
-                        place_data = place_doc.to_dict()
-                        
-                        # Extract coordinates (handle both new and old formats)
-                        coordinates = place_data.get('coordinates')
-                        if coordinates and isinstance(coordinates, dict):
-                            # New format: {"latitude": x, "longitude": y}
-                            latitude = coordinates.get('latitude', 0.0)
-                            longitude = coordinates.get('longitude', 0.0)
-                        else:
-                            # Old format: firestore.GeoPoint
-                            coordinate = place_data.get('coordinate')
-                            if coordinate and hasattr(coordinate, 'latitude'):
-                                latitude = coordinate.latitude
-                                longitude = coordinate.longitude
-                            else:
-                                latitude = longitude = 0.0
-                        
-                        # Add to Whoosh index with correct structure
-                        # IMPORTANT: Ensure place_id is uppercase for consistency
-                        writer.add_document(
-                            name=place_data.get('name', ''),
-                            place_id=place_doc.id.upper() if place_doc.id else place_doc.id,  # Ensure uppercase
-                            address=place_data.get('address', ''),
-                            latitude=latitude,
-                            longitude=longitude
-                        )
+            if self.db is not None:
+                # Index every place as it streams in, with one writer and one commit
+                indexed = whoosh_provider.save_places(
+                    (self._whoosh_place(place_doc) for place_doc in self.iter_places()),
+                    parallel=True
+                )
                 
-                logger.info(f"Indexed {len(places)} places in Whoosh")
+                logger.info(f"Indexed {indexed} places in Whoosh")
                 
                 # Force refresh the index
                 whoosh_provider.force_refresh()
@@ -653,19 +1465,23 @@ class PlaceStorage:
                 return False
                 
         except ImportError:
-            logger.error("WhooshSearchProvider not available, trying subprocess method")
-            # Fallback to subprocess method
-            import subprocess
-            import os
+            logger.error("WhooshSearchProvider not available, trying the index_places script in-process")
+            # Run the standalone indexer on a thread rather than starting a new interpreter
+            outcome = {}
             
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            index_script = os.path.join(project_root, 'index_places.py')
-            
-            result = subprocess.run(['python', index_script], 
-                                  capture_output=True, text=True, cwd=project_root)
+            def run_indexer():
+                try:
+                    from index_places import index_places_from_firestore
+                    outcome['success'] = index_places_from_firestore()
+                except Exception as e:
+                    logger.error(f"Error running index_places: {str(e)}")
             
-            return result.returncode == 0
+            indexer = threading.Thread(target=run_indexer, name="whoosh-reindex", daemon=True)
+            indexer.start()
+            indexer.join(timeout=self.REINDEX_TIMEOUT)
+            if indexer.is_alive():
+                logger.error(f"index_places did not finish within {self.REINDEX_TIMEOUT}s")
+            return outcome.get('success', False)
             
         except Exception as e:
             logger.error(f"Error triggering Whoosh reindex: {str(e)}")
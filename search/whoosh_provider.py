@@ -3,48 +3,191 @@ import logging
 import whoosh.index
 import whoosh.fields
 import whoosh.qparser
+import whoosh.query
 from whoosh.analysis import StandardAnalyzer
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple
 import uuid
 import time
+import hashlib
+import fcntl
+import shutil
+import re
+import threading
+from collections import OrderedDict
 from firebase_admin import firestore
 
 from search.base import SearchProvider, SearchResult
-from search.storage import PlaceStorage
+from search.storage import PlaceStorage, extract_coordinates
+from search.place_fields import normalize_name
 from search.detail_place import DetailPlace
 
 logger = logging.getLogger(__name__)
 
+# Country/state suffixes ignored when comparing addresses
+_SUFFIX_RE = re.compile(r',\s*(?:usa|united states|ut|utah)\b')
+
+def memory_index_path() -> Optional[str]:
+    """In-memory (tmpfs) location to serve the index from, set by WHOOSH_MEMORY_DIR,
+    or None when unset or its parent directory doesn't exist."""
+    path = os.getenv('WHOOSH_MEMORY_DIR')
+    if path and os.path.isdir(os.path.dirname(os.path.abspath(path))):
+        return path
+    return None
+
+def _is_lock_file(name: str) -> bool:
+    return name.endswith('LOCK') or name.endswith('.lock')
+
+def normalize_address(address: str) -> str:
+    """Lowercased address with common country/state suffixes removed in a single regex pass."""
+    return _SUFFIX_RE.sub('', (address or '').lower().strip())
+
+def normalized_name_address(place: SearchResult) -> Tuple[str, str]:
+    """Normalized (name, address) for comparing places, using the values
+    precomputed at index time when the place is a local search hit."""
+    extra = place.additional_data or {}
+    norm_name = extra.get('norm_name')
+    if norm_name is None:
+        return normalize_name(place.name), normalize_address(place.address)
+    return norm_name, extra['norm_addr']
+
+def build_schema() -> whoosh.fields.Schema:
+    """Schema of the places index, shared by everything that creates it."""
+    # Simplified schema focusing on name
+    return whoosh.fields.Schema(
+        name=whoosh.fields.TEXT(stored=True, analyzer=StandardAnalyzer()),  # Using StandardAnalyzer for better text matching
+        place_id=whoosh.fields.ID(stored=True),
+        # Leading 2-5 character grams of each name word, for type-ahead on short queries
+        name_ngram=whoosh.fields.NGRAMWORDS(minsize=2, maxsize=5, stored=False, at='start'),
+        # Identical places share a key, so search can collapse them in the index
+        dedup_key=whoosh.fields.ID(sortable=True),
+        # Keep these for the response but don't search on them
+        address=whoosh.fields.STORED,
+        latitude=whoosh.fields.STORED,
+        longitude=whoosh.fields.STORED,
+        # Normalized forms used to compare local hits with other providers' results
+        norm_name=whoosh.fields.STORED,
+        norm_addr=whoosh.fields.STORED
+    )
+
+def dedup_key(name: str, address: str, latitude: float, longitude: float) -> str:
+    """Short hash identifying a place by name, address and rounded coordinates."""
+    key = f"{(name or '').lower()}|{(address or '').lower()}|{round(latitude or 0.0, 4)}|{round(longitude or 0.0, 4)}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+def place_document(place: SearchResult) -> dict:
+    """Index fields for a place, for passing to writer.add_document."""
+    return {
+        'name': place.name,
+        'place_id': place.place_id,
+        'name_ngram': place.name,
+        'dedup_key': dedup_key(place.name, place.address, place.latitude, place.longitude),
+        'address': place.address,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'norm_name': normalize_name(place.name),
+        'norm_addr': normalize_address(place.address)
+    }
+
 class WhooshSearchProvider(SearchProvider):
-    def __init__(self, index_path: str = "whoosh_index"):
-        self.index_path = index_path
+    # Search result cache limits
+    SEARCH_CACHE_TTL = 60
+    SEARCH_CACHE_SIZE = 512
+    # Firestore place document cache limits
+    PLACE_CACHE_TTL = 300
+    PLACE_CACHE_SIZE = 1024
+    # Queries shorter than this are matched as name prefixes via name_ngram
+    PREFIX_QUERY_MAX_LEN = 4
+    # Seconds get_index_info reuses its last result
+    INDEX_INFO_TTL = 5
+    # Sentinel file locked while the index is created or upgraded
+    INIT_LOCK_FILE = '.init.lock'
+    # Seconds between copies of an in-memory index back to disk
+    FLUSH_INTERVAL = 300
+    # Seconds update_places waits for another writer to release the index lock
+    WRITER_TIMEOUT = 10
+
+    # Whoosh index, opened by _refresh_index
+    ix: Any
+
+    def __init__(self, index_path: str = "whoosh_index", memory_path: Optional[str] = None):
+        # With a memory path the index is served from there (e.g. /dev/shm) and
+        # index_path is only its persistent copy, updated by flush_to_disk
+        self.persist_path = index_path
+        self.index_path = memory_path or memory_index_path() or index_path
+        self._flush_stop = threading.Event()
+        # LRU cache of (query, limit) -> (cached_at, results), cleared whenever the index changes
+        self._search_cache: 'OrderedDict[Tuple[str, int], Tuple[float, Tuple[SearchResult, ...]]]' = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        # LRU cache of place_id -> (cached_at, place_data), invalidated when the
+        # place is re-indexed or written through PlaceStorage
+        self._place_cache: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._place_cache_lock = threading.Lock()
+        # Long-lived searcher, refreshed before each query; not safe to share across threads
+        self._searcher: Any = None
+        self._searcher_lock = threading.Lock()
+        self._index_info: Optional[Dict[str, Any]] = None
+        self._index_info_at = 0.0
         logger.debug(f"Initializing WhooshSearchProvider with index path: {index_path}")
         self._ensure_index()
-        self.storage = PlaceStorage()
+        self.storage = PlaceStorage.get()
+        self.storage.add_write_listener(self._invalidate_place)
         self._last_index_refresh = time.time()
         
-    def _ensure_index(self):
-        if not os.path.exists(self.index_path):
-            logger.debug(f"Creating new Whoosh index at {self.index_path}")
-            os.mkdir(self.index_path)
-            # Simplified schema focusing on name
-            schema = whoosh.fields.Schema(
-                name=whoosh.fields.TEXT(stored=True, analyzer=StandardAnalyzer()),  # Using StandardAnalyzer for better text matching
-                place_id=whoosh.fields.ID(stored=True),
-                # Keep these for the response but don't search on them
-                address=whoosh.fields.STORED,
-                latitude=whoosh.fields.STORED,
-                longitude=whoosh.fields.STORED
-            )
-            whoosh.index.create_in(self.index_path, schema)
-        else:
-            logger.debug(f"Using existing Whoosh index at {self.index_path}")
-        self._refresh_index()
+    def _ensure_index(self) -> None:
+        os.makedirs(self.index_path, exist_ok=True)
+        # Hold a file lock so concurrently starting workers don't create or upgrade the index twice
+        with open(os.path.join(self.index_path, self.INIT_LOCK_FILE), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Load an in-memory index from its persistent copy on first start
+                if (self.index_path != self.persist_path and not whoosh.index.exists_in(self.index_path)
+                        and whoosh.index.exists_in(self.persist_path)):
+                    logger.info(f"Copying Whoosh index from {self.persist_path} to {self.index_path}")
+                    shutil.copytree(self.persist_path, self.index_path, dirs_exist_ok=True,
+                                    ignore=lambda d, names: [n for n in names if _is_lock_file(n)])
+                
+                if not whoosh.index.exists_in(self.index_path):
+                    logger.debug(f"Creating new Whoosh index at {self.index_path}")
+                    whoosh.index.create_in(self.index_path, build_schema())
+                else:
+                    logger.debug(f"Using existing Whoosh index at {self.index_path}")
+                self._refresh_index()
+                
+                missing = [name for name in build_schema().names() if name not in self.ix.schema]
+                if missing:
+                    self._upgrade_schema(missing)
+                    self._refresh_index()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
     
-    def _refresh_index(self):
+    def _upgrade_schema(self, missing: List[str]) -> None:
+        """Upgrade an index created with an older schema by adding the missing
+        fields and re-adding its stored documents with them filled in."""
+        logger.info(f"Adding fields {missing} to existing Whoosh index")
+        with self.ix.searcher() as searcher:
+            stored = list(searcher.all_stored_fields())
+        
+        schema = build_schema()
+        with self.ix.writer() as writer:
+            for name in missing:
+                writer.add_field(name, schema[name])
+            writer.delete_by_query(whoosh.query.Every())
+            for fields in stored:
+                writer.add_document(**place_document(SearchResult(
+                    fields.get('name', ''),
+                    fields.get('address', ''),
+                    fields.get('latitude', 0.0),
+                    fields.get('longitude', 0.0),
+                    fields.get('place_id'),
+                    "local"
+                )))
+        logger.info(f"Re-indexed {len(stored)} places with the current schema")
+    
+    def _refresh_index(self) -> None:
         """Force refresh the index to ensure we're using the latest data."""
         try:
-            # Close existing index if it exists
+            # Close the searcher and existing index if they exist
+            self._close_searcher()
             if hasattr(self, 'ix'):
                 try:
                     self.ix.close()
@@ -53,18 +196,88 @@ class WhooshSearchProvider(SearchProvider):
             
             # Open the index fresh
             self.ix = whoosh.index.open_dir(self.index_path)
+            with self._searcher_lock:
+                self._searcher = self.ix.searcher()
+            
+            # Parsers depend on the schema, so rebuild them with the index
+            self._name_parser = whoosh.qparser.QueryParser("name", self.ix.schema)
+            self._prefix_parser = whoosh.qparser.QueryParser("name_ngram", self.ix.schema)
+            self._delete_all_q = self._name_parser.parse("*")
             self._last_index_refresh = time.time()
+            self._clear_search_cache()
+            self._index_info = None
             logger.debug(f"Whoosh index refreshed at {self._last_index_refresh}")
         except Exception as e:
             logger.error(f"Error refreshing Whoosh index: {str(e)}")
             raise
     
+    def _close_searcher(self) -> None:
+        with self._searcher_lock:
+            if self._searcher is not None:
+                try:
+                    self._searcher.close()
+                except:
+                    pass
+                self._searcher = None
+    
+    def close(self) -> None:
+        """Close the searcher and the index, persisting an in-memory index first."""
+        self._flush_stop.set()
+        self.flush_to_disk()
+        self._close_searcher()
+        if hasattr(self, 'ix'):
+            self.ix.close()
+    
+    def flush_to_disk(self) -> int:
+        """Copy an in-memory index to its persistent path. Returns the number of files copied."""
+        if self.index_path == self.persist_path:
+            return 0
+        
+        os.makedirs(self.persist_path, exist_ok=True)
+        # Hold the index write lock so no commit lands halfway through the copy
+        write_lock = self.ix.storage.lock(self.ix.indexname + "_WRITELOCK")
+        write_lock.acquire(blocking=True)
+        try:
+            names = [n for n in os.listdir(self.index_path) if not _is_lock_file(n)]
+            # Copy segments before the TOC that references them
+            names.sort(key=lambda n: n.endswith('.toc'))
+            for name in names:
+                shutil.copy2(os.path.join(self.index_path, name), os.path.join(self.persist_path, name))
+            
+            # Drop segments that merges have removed from the live index
+            current = set(names)
+            for name in os.listdir(self.persist_path):
+                if name not in current and not _is_lock_file(name):
+                    os.remove(os.path.join(self.persist_path, name))
+        finally:
+            write_lock.release()
+        
+        logger.debug(f"Flushed {len(names)} Whoosh index files to {self.persist_path}")
+        return len(names)
+    
+    def start_periodic_flush(self) -> None:
+        """Persist an in-memory index every FLUSH_INTERVAL seconds from a daemon thread."""
+        if self.index_path == self.persist_path:
+            return
+        
+        def flush_loop() -> None:
+            while not self._flush_stop.wait(self.FLUSH_INTERVAL):
+                try:
+                    self.flush_to_disk()
+                except Exception as e:
+                    logger.error(f"Error flushing Whoosh index to disk: {str(e)}")
+        
+        threading.Thread(target=flush_loop, name="whoosh-flush", daemon=True).start()
+    
     def get_index_info(self) -> Dict[str, Any]:
-        """Get information about the current index state."""
+        """Get information about the current index state, cached for INDEX_INFO_TTL seconds."""
         try:
             if not hasattr(self, 'ix'):
                 return {"error": "Index not initialized"}
             
+            if self._index_info is not None and time.monotonic() - self._index_info_at < self.INDEX_INFO_TTL:
+                return dict(self._index_info)
+            
             # Get index stats
             stats = {
                 "index_path": self.index_path,
@@ -77,134 +290,242 @@ class WhooshSearchProvider(SearchProvider):
             
             # Get file modification times
             if os.path.exists(self.index_path):
-                toc_files = [f for f in os.listdir(self.index_path) if f.endswith('.toc')]
-                if toc_files:
-                    latest_toc = max(toc_files, key=lambda f: os.path.getmtime(os.path.join(self.index_path, f)))
+                # One stat per TOC file, taken from the directory entry
+                with os.scandir(self.index_path) as entries:
+                    tocs = [(e.stat().st_mtime, e.name) for e in entries if e.name.endswith('.toc')]
+                if tocs:
+                    latest_time, latest_toc = max(tocs)
                     stats["latest_toc_file"] = latest_toc
-                    stats["latest_toc_time"] = os.path.getmtime(os.path.join(self.index_path, latest_toc))
-                    stats["latest_toc_time_readable"] = time.ctime(stats["latest_toc_time"])
+                    stats["latest_toc_time"] = latest_time
+                    stats["latest_toc_time_readable"] = time.ctime(latest_time)
             
-            return stats
+            self._index_info = stats
+            self._index_info_at = time.monotonic()
+            return dict(stats)
         except Exception as e:
             logger.error(f"Error getting index info: {str(e)}")
             return {"error": str(e)}
 
     def _is_same_place(self, place1: SearchResult, place2: SearchResult) -> bool:
         """Check if two places are likely the same based on name, address, and coordinates."""
-        # Normalize names and addresses for comparison
-        name1 = place1.name.lower().strip()
-        name2 = place2.name.lower().strip()
+        # Cheapest filter first: coordinates must be very close (within ~100 meters)
+        if abs(place1.latitude - place2.latitude) >= 0.001 or abs(place1.longitude - place2.longitude) >= 0.001:
+            return False
         
-        # If names are exactly the same
-        if name1 == name2:
-            # Check if addresses are exactly the same after normalization
-            addr1 = place1.address.lower().strip()
-            addr2 = place2.address.lower().strip()
-            
-            # Remove common variations
-            for suffix in [', usa', ', united states', ', ut', ', utah']:
-                addr1 = addr1.replace(suffix, '')
-                addr2 = addr2.replace(suffix, '')
-            
-            # If addresses are exactly the same after normalization
-            if addr1 == addr2:
-                # Check if coordinates are very close (within ~100 meters)
-                lat_diff = abs(place1.latitude - place2.latitude)
-                lon_diff = abs(place1.longitude - place2.longitude)
-                if lat_diff < 0.001 and lon_diff < 0.001:  # Approximately 100 meters
-                    return True
-                
-        return False
+        # Names and addresses must match after normalization
+        name1, addr1 = normalized_name_address(place1)
+        name2, addr2 = normalized_name_address(place2)
+        return name1 == name2 and addr1 == addr2
 
-    def search(self, query: str, limit: int = 10, latitude: float = None, longitude: float = None) -> List[SearchResult]:
-        with self.ix.searcher() as searcher:
-            # Create a query parser that only searches the name field
-            query_parser = whoosh.qparser.QueryParser("name", self.ix.schema)
-            q = query_parser.parse(query)
-            results = searcher.search(q, limit=limit)
+    def _refresh_searcher(self) -> Any:
+        """Reuse the open searcher, swapping it only if the index changed. Caller holds _searcher_lock."""
+        # refresh() returns the same searcher unless there are new commits; otherwise it
+        # hands the unchanged segment readers to the new searcher and closes the rest,
+        # so the old searcher must not be closed again
+        self._searcher = self._searcher.refresh()
+        return self._searcher
+
+    def _clear_search_cache(self) -> None:
+        with self._search_cache_lock:
+            self._search_cache.clear()
+
+    def search(self, query: str, limit: int = 10, latitude: Optional[float] = None, longitude: Optional[float] = None) -> List[SearchResult]:
+        key = (query.lower(), limit)
+        with self._search_cache_lock:
+            cached = self._search_cache.get(key)
+            if cached is not None:
+                cached_at, cached_results = cached
+                if time.monotonic() - cached_at < self.SEARCH_CACHE_TTL:
+                    self._search_cache.move_to_end(key)
+                    return list(cached_results)
+                del self._search_cache[key]
+        
+        results = self._search_index(query, limit)
+        
+        with self._search_cache_lock:
+            self._search_cache[key] = (time.monotonic(), tuple(results))
+            if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+        return results
+
+    def _search_index(self, query: str, limit: int) -> List[SearchResult]:
+        with self._searcher_lock:
+            searcher = self._refresh_searcher()
             
-            # Convert to SearchResult objects with deduplication
-            search_results = []
-            seen_places = set()
+            # Short queries are type-ahead: match name prefixes instead of scoring whole words
+            if 2 <= len(query.strip()) < self.PREFIX_QUERY_MAX_LEN:
+                q = self._prefix_parser.parse(query)
+            else:
+                # Parse with the cached parser that only searches the name field
+                q = self._name_parser.parse(query)
+            # Duplicate places share a dedup_key, so the index keeps only the best hit of each
+            results = searcher.search(q, limit=limit, collapse="dedup_key", collapse_limit=1)
             
-            for result in results:
-                search_result = SearchResult(
-                    name=result["name"],
-                    address=result.get("address", ""),  # Use get() since these are optional
-                    latitude=result.get("latitude", 0.0),
-                    longitude=result.get("longitude", 0.0),
-                    place_id=result["place_id"],
-                    source="local"
-                )
-                
-                # Create a unique key for this place using name, address, and coordinates
-                place_key = f"{search_result.name.lower()}|{search_result.address.lower()}|{search_result.latitude}|{search_result.longitude}"
-                
-                # Only add if we haven't seen this exact place before
-                if place_key not in seen_places:
-                    search_results.append(search_result)
-                    seen_places.add(place_key)
+            # Convert to SearchResult objects
+            search_results = []
+            for hit in results:
+                # Load the stored fields once as a plain dict
+                fields = hit.fields()
+                search_results.append(SearchResult(
+                    fields["name"],
+                    fields.get("address", ""),  # Use get() since these are optional
+                    fields.get("latitude", 0.0),
+                    fields.get("longitude", 0.0),
+                    fields["place_id"],
+                    "local",
+                    # Precomputed at index time, so comparisons skip the string work
+                    {'norm_name': fields.get("norm_name"), 'norm_addr': fields.get("norm_addr")}
+                ))
             
             return search_results
 
+    def _cached_place_data(self, place_id: str) -> Optional[Dict[str, Any]]:
+        with self._place_cache_lock:
+            cached = self._place_cache.get(place_id)
+            if cached is not None:
+                cached_at, place_data = cached
+                if time.monotonic() - cached_at < self.PLACE_CACHE_TTL:
+                    self._place_cache.move_to_end(place_id)
+                    return place_data
+                del self._place_cache[place_id]
+        return None
+    
+    def _cache_place_data(self, place_id: str, place_data: Dict[str, Any]) -> None:
+        with self._place_cache_lock:
+            self._place_cache[place_id] = (time.monotonic(), place_data)
+            if len(self._place_cache) > self.PLACE_CACHE_SIZE:
+                self._place_cache.popitem(last=False)
+    
+    def _get_place_data(self, place_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a place document from Firestore, served from the LRU cache when fresh."""
+        place_data = self._cached_place_data(place_id)
+        if place_data is not None:
+            return place_data
+        
+        # Get the place document from Firestore
+        place_doc = self.storage.places_ref.document(place_id).get()
+        if not place_doc.exists:
+            return None
+        
+        place_data = place_doc.to_dict()
+        self._cache_place_data(place_id, place_data)
+        return place_data
+    
+    def _invalidate_place(self, place_id: str) -> None:
+        with self._place_cache_lock:
+            self._place_cache.pop(place_id, None)
+
+    def _doc_to_detail(self, place_id: str, place_data: Dict[str, Any]) -> DetailPlace:
+        coordinate = firestore.GeoPoint(*(extract_coordinates(place_data) or (0.0, 0.0)))
+        return DetailPlace.from_firestore(place_id, place_data, coordinate)
+
     def get_place_details(self, place_id: str) -> DetailPlace:
         try:
-            # Get the place document from Firestore
-            places_ref = self.storage.db.collection('places')
-            place_doc = places_ref.document(place_id).get()
-            
-            if not place_doc.exists:
+            place_data = self._get_place_data(place_id)
+            if place_data is None:
                 raise ValueError(f"Place with ID {place_id} not found")
-                
-            place_data = place_doc.to_dict()
-            coordinate = place_data.get('coordinate')
             
-            return DetailPlace(
-                id=place_id,
-                name=place_data.get('name', ''),
-                address=place_data.get('address', ''),
-                city=place_data.get('city', ''),
-                mapbox_id=place_data.get('mapboxId'),
-                google_places_id=place_data.get('googlePlacesId'),
-                coordinate=coordinate,
-                categories=place_data.get('categories', []),
-                phone=place_data.get('phone'),
-                rating=place_data.get('rating'),
-                open_hours=place_data.get('openHours', []),
-                description=place_data.get('description'),
-                price_level=place_data.get('priceLevel'),
-                reservable=place_data.get('reservable'),
-                serves_breakfast=place_data.get('servesBreakfast'),
-                serves_lunch=place_data.get('servesLunch'),
-                serves_dinner=place_data.get('servesDinner'),
-                instagram=place_data.get('instagram'),
-                twitter=place_data.get('twitter')
-            )
+            return self._doc_to_detail(place_id, place_data)
         except Exception as e:
             logger.error(f"Error getting place from Firestore: {str(e)}")
             raise
+
+    def get_places_details(self, place_ids: List[str]) -> List[DetailPlace]:
+        """Get details for many places, fetching uncached ones in a single Firestore read.
+        Places that don't exist are skipped; the rest keep the order of place_ids."""
+        try:
+            found = {}
+            missing = []
+            for place_id in place_ids:
+                place_data = self._cached_place_data(place_id)
+                if place_data is not None:
+                    found[place_id] = place_data
+                else:
+                    missing.append(place_id)
+            
+            if missing:
+                places_ref = self.storage.places_ref
+                for place_doc in self.storage.db.get_all([places_ref.document(place_id) for place_id in missing]):
+                    if place_doc.exists:
+                        place_data = place_doc.to_dict()
+                        self._cache_place_data(place_doc.id, place_data)
+                        found[place_doc.id] = place_data
+            
+            return [self._doc_to_detail(place_id, found[place_id]) for place_id in place_ids if place_id in found]
+        except Exception as e:
+            logger.error(f"Error getting places from Firestore: {str(e)}")
+            raise
             
     def save_place(self, place: SearchResult) -> None:
         with self.ix.writer() as writer:
-            writer.add_document(
-                name=place.name,
-                place_id=place.place_id,
-                address=place.address,
-                latitude=place.latitude,
-                longitude=place.longitude
-            )
+            writer.add_document(**place_document(place))
+        self._invalidate_place(place.place_id)
+        self._clear_search_cache()
+
+    def save_places(self, places: Iterable[SearchResult], parallel: bool = False) -> int:
+        """Index many places with a single writer and one commit. Returns the number indexed.
+        
+        With parallel, segments are built in worker processes and kept as
+        separate segments on commit; worth it for full rebuilds, not small batches.
+        """
+        if parallel:
+            writer = self.ix.writer(limitmb=256, procs=os.cpu_count() or 1, multisegment=True)
+        else:
+            writer = self.ix.writer(limitmb=256)
+        
+        count = 0
+        with writer:
+            for place in places:
+                writer.add_document(**place_document(place))
+                self._invalidate_place(place.place_id)
+                count += 1
+        self._clear_search_cache()
+        return count
+
+    def update_places(self, places: List[SearchResult]) -> int:
+        """Add or replace places in the index, keyed by place_id. Returns the number indexed.
+        Waits up to WRITER_TIMEOUT seconds for the index lock if another writer holds it."""
+        try:
+            writer = self.ix.writer(timeout=self.WRITER_TIMEOUT)
+        except whoosh.index.LockError:
+            logger.error(f"Whoosh index still locked after {self.WRITER_TIMEOUT}s, {len(places)} places not indexed")
+            raise
+        
+        with writer:
+            for place in places:
+                # Replace any existing entry for the place
+                writer.delete_by_term('place_id', place.place_id)
+                writer.add_document(**place_document(place))
+                self._invalidate_place(place.place_id)
+        self._clear_search_cache()
+        return len(places)
 
     def clear_index(self) -> None:
         """Clear all documents from the Whoosh index."""
         logger.info("Clearing Whoosh index")
         with self.ix.writer() as writer:
-            writer.delete_by_query(whoosh.qparser.QueryParser("name", self.ix.schema).parse("*"))
+            writer.delete_by_query(self._delete_all_q)
+        self._index_info = None
         logger.info("Whoosh index cleared successfully")
         # Force refresh after clearing
-        self._refresh_index()
+        self.force_refresh()
     
     def force_refresh(self) -> None:
-        """Force refresh the index to ensure we're using the latest data."""
+        """Pick up the latest commits, including ones from other writers.
+        
+        Only segments that changed are re-read; the index itself stays open.
+        """
         logger.info("Forcing Whoosh index refresh")
-        self._refresh_index()
-        logger.info("Whoosh index refresh completed") 
\ No newline at end of file
+        with self._searcher_lock:
+            self._refresh_searcher()
+        self._last_index_refresh = time.time()
+        self._clear_search_cache()
+        self._index_info = None
+        logger.info("Whoosh index refresh completed")
+    
+    def optimize(self) -> None:
+        """Merge the index into a single segment. Costly on large indexes, so
+        meant for scheduled maintenance rather than after every reindex."""
+        logger.info("Optimizing Whoosh index")
+        self.ix.optimize()
+        self.force_refresh() 
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""Optional build of the compiled search hot path.
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+mypyc compiles the Whoosh provider and the modules its result loop depends on
+into extension modules next to the sources, which Python imports in place of
+the .py files. Skip this step where mypy or a C toolchain isn't available; the
+app runs the interpreted sources unchanged.
+"""
+from setuptools import setup
+
+def ext_modules():
+    """Compiled modules, or none when mypy (and so mypyc) isn't installed."""
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        print("mypy not installed, skipping the compiled search modules")
+        return []
+    return mypycify([
+        '--ignore-missing-imports',
+        '--follow-imports=silent',
+        'search/base.py',
+        'search/search_result.py',
+        'search/whoosh_provider.py',
+    ])
+
+setup(
+    name='mesa-backend-search',
+    ext_modules=ext_modules(),
+)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Test PlaceStorage's BulkWriter error callback with a fake write failure."""
+
+from types import SimpleNamespace
+
+from search.storage import PlaceStorage
+
+class FakeBulkWriter:
+    """Stands in for a Firestore BulkWriter, keeping the registered error callback."""
+    def on_write_error(self, callback):
+        self.callback = callback
+
+def make_failure(doc_id: str, attempts: int) -> SimpleNamespace:
+    """Build an object shaped like google-cloud-firestore's BulkWriteFailure."""
+    return SimpleNamespace(
+        operation=SimpleNamespace(reference=SimpleNamespace(id=doc_id)),
+        code=14,
+        message="UNAVAILABLE",
+        attempts=attempts
+    )
+
+def test_bulk_write_error():
+    """Test that failures are retried, then recorded by document ID."""
+    print("Testing BulkWriter error callback...")
+    
+    # Skip __init__ so no Firestore connection is needed
+    storage = PlaceStorage.__new__(PlaceStorage)
+    bulk_writer = FakeBulkWriter()
+    storage.db = SimpleNamespace(bulk_writer=lambda options: bulk_writer)
+    
+    failed = set()
+    storage._bulk_writer(failed)
+    
+    # Attempts below WRITE_RETRIES are retried and not recorded
+    assert bulk_writer.callback(make_failure("PLACE-1", 1), bulk_writer) is True
+    assert failed == set()
+    print("✓ Early failure retried")
+    
+    # The final attempt gives up and records the failed document ID
+    assert bulk_writer.callback(make_failure("PLACE-1", PlaceStorage.WRITE_RETRIES), bulk_writer) is False
+    assert failed == {"PLACE-1"}
+    print("✓ Final failure recorded")
+
+if __name__ == "__main__":
+    test_bulk_write_error()
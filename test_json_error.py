@@ -2,7 +2,8 @@
 """Test JSON parsing with control characters."""
 
 import requests
-import json
+import orjson
+from url_processors.sanitize import strip_control_chars
 
 # Test data with control character (tab character in URL)
 test_cases = [
@@ -28,14 +29,14 @@ for test in test_cases:
     
     try:
         # Try to serialize to JSON
-        json_str = json.dumps(test['data'])
+        json_str = orjson.dumps(test['data']).decode()
         print(f"✓ JSON serialization successful")
         
         # Try to parse it back
-        parsed = json.loads(json_str)
+        parsed = orjson.loads(json_str)
         print(f"✓ JSON parsing successful")
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"✗ JSON error: {e}")
     except Exception as e:
         print(f"✗ Error: {e}")
@@ -47,6 +48,5 @@ print(f"URL: {repr(url_with_tab)}")
 
 # The issue is likely that the frontend is sending the URL with actual control characters
 # Let's test how to handle this
-import re
-cleaned_url = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', url_with_tab)
+cleaned_url = strip_control_chars(url_with_tab)
 print(f"Cleaned URL: {repr(cleaned_url)}")
\ No newline at end of file
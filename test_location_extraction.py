@@ -4,10 +4,11 @@
 from url_processors.tiktok_processor import TikTokProcessor
 import json
 
+# One processor shared by every test in this module
+_PROC = TikTokProcessor()
+
 def test_location_extraction():
     """Test the location extraction logic with sample data."""
-    processor = TikTokProcessor()
-    
     # Test cases with different caption formats
     test_cases = [
         {
@@ -58,7 +59,7 @@ def test_location_extraction():
         print(f"Test: {test['name']}")
         print(f"Caption: {test['data']['caption']}")
         
-        location_info = processor.extract_location_info(test['data'])
+        location_info = _PROC.extract_location_info(test['data'])
         
         if location_info:
             print("✓ Location extracted:")
@@ -3,9 +3,9 @@
 
 import time
 
-def generate_privacy_policy():
-    """Generate the privacy policy HTML content."""
-    privacy_content = """
+# Privacy policy page split around its two "last updated" dates
+_PRIVACY_CACHE = {"date": None, "body": None}
+_TEMPLATE_PRE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -28,7 +28,8 @@ def generate_privacy_policy():
     </head>
     <body>
         <h1>Privacy Policy</h1>
-        <p class="last-updated">Last updated: """ + time.strftime("%B %d, %Y") + """</p>
+        <p class="last-updated">Last updated: """
+_TEMPLATE_MID = """</p>
         
         <div class="section">
             <h2>1. Information We Collect</h2>
@@ -58,13 +59,21 @@ def generate_privacy_policy():
             <p>
                 <strong>Email:</strong> privacy@mesa-location-services.com<br>
                 <strong>Service:</strong> Mesa Location Services API<br>
-                <strong>Last Updated:</strong> """ + time.strftime("%B %d, %Y") + """
+                <strong>Last Updated:</strong> """
+_TEMPLATE_POST = """
             </p>
         </div>
     </body>
     </html>
     """
-    return privacy_content
+
+def generate_privacy_policy():
+    """Generate the privacy policy HTML content, rebuilt only when the date changes."""
+    today = time.strftime("%B %d, %Y")
+    if _PRIVACY_CACHE["date"] != today:
+        _PRIVACY_CACHE["body"] = "".join((_TEMPLATE_PRE, today, _TEMPLATE_MID, today, _TEMPLATE_POST))
+        _PRIVACY_CACHE["date"] = today
+    return _PRIVACY_CACHE["body"]
 
 def test_privacy_policy():
     """Test the privacy policy content."""
@@ -5,26 +5,27 @@ import os
 from url_processors.tiktok_processor import TikTokProcessor
 import json
 
+# One processor shared by every test in this module
+_PROC = TikTokProcessor()
+
 def test_tiktok_api():
     """Test the TikTok API integration."""
-    processor = TikTokProcessor()
-    
     # Test URL
     test_url = "https://www.tiktok.com/t/ZP8hJe4ym/"
     
     print("Testing TikTok API integration...")
     print(f"URL: {test_url}")
-    print(f"Has API credentials: {bool(processor.access_token)}")
+    print(f"Has API credentials: {bool(_PROC.access_token)}")
     
     try:
         # Extract data
-        data = processor.extract_data(test_url)
+        data = _PROC.extract_data(test_url)
         
         print("\n=== Extracted Data ===")
         print(json.dumps(data, indent=2, default=str))
         
         # Extract location info
-        location_info = processor.extract_location_info(data)
+        location_info = _PROC.extract_location_info(data)
         
         print("\n=== Location Info ===")
         if location_info:
@@ -2,16 +2,28 @@
 """Test script for the URL processing endpoint."""
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import sys
+import pytest
 
 # Base URL - adjust if running on different port
 BASE_URL = "http://localhost:5002"
 
+# One session for every request, so the connection to the server is reused
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0))
+
+@pytest.fixture(autouse=True, scope="module")
+def _use_live_server(live_server):
+    """Under pytest, point the tests at a server started (and health-polled) by conftest."""
+    global BASE_URL
+    BASE_URL = live_server
+
 def test_supported_platforms():
     """Test getting supported platforms."""
     print("\n1. Testing supported platforms endpoint...")
-    response = requests.get(f"{BASE_URL}/process-url/platforms")
+    response = SESSION.get(f"{BASE_URL}/process-url/platforms")
     if response.status_code == 200:
         data = response.json()
         print(f"✓ Supported platforms: {data['supported_platforms']}")
@@ -24,7 +36,7 @@ def test_tiktok_url(url):
     print(f"   URL: {url}")
     
     payload = {"url": url}
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/process-url",
         json=payload,
         headers={"Content-Type": "application/json"}
@@ -51,7 +63,7 @@ def test_invalid_url():
     """Test with invalid URL."""
     print("\n3. Testing invalid URL...")
     payload = {"url": "not-a-valid-url"}
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/process-url",
         json=payload,
         headers={"Content-Type": "application/json"}
@@ -66,7 +78,7 @@ def test_unsupported_platform():
     """Test with unsupported platform URL."""
     print("\n4. Testing unsupported platform...")
     payload = {"url": "https://www.example.com/video/123"}
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/process-url",
         json=payload,
         headers={"Content-Type": "application/json"}
@@ -81,7 +93,7 @@ def test_missing_url():
     """Test with missing URL in request."""
     print("\n5. Testing missing URL in request...")
     payload = {}
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/process-url",
         json=payload,
         headers={"Content-Type": "application/json"}
@@ -1,10 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Tuple
-import re
+from typing import Dict, Any, FrozenSet, Optional, Tuple
+from urllib.parse import urlparse
 
 class URLProcessor(ABC):
     """Base class for URL processors that extract data from various platforms."""
     
+    # Hostnames this processor handles, used by the orchestrator to dispatch URLs;
+    # processors that leave it empty are tried with can_process on every URL
+    hosts: FrozenSet[str] = frozenset()
+    
+    # Substrings every URL this processor accepts must contain, checked before
+    # any parsing or regex work; empty means no pre-filter
+    tokens: Tuple[str, ...] = ()
+    
     @abstractmethod
     def can_process(self, url: str) -> bool:
         """Check if this processor can handle the given URL."""
@@ -29,12 +37,12 @@ class URLProcessor(ABC):
         pass
     
     def validate_url(self, url: str) -> bool:
-        """Basic URL validation."""
-        url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-            r'localhost|'  # localhost...
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-        return url_pattern.match(url) is not None
\ No newline at end of file
+        """Basic URL validation: an http(s) scheme and a dotted, localhost or IP host."""
+        try:
+            parsed = urlparse(url)
+        except ValueError:
+            return False
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+            return False
+        host = parsed.hostname or ''
+        return bool(host) and ('.' in host or host == 'localhost' or host.replace('.', '').isdigit())
\ No newline at end of file
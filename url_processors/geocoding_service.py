@@ -1,18 +1,82 @@
 import logging
 import googlemaps
+import requests
+from requests.adapters import HTTPAdapter
+import re
+import copy
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 import os
 
 logger = logging.getLogger(__name__)
 
+# Seconds before a Google Maps request gives up instead of holding the request thread
+REQUEST_TIMEOUT = 5
+
+# Shared by every Google Maps client so connections to the API are pooled across requests
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=1))
+
+_WS_RE = re.compile(r'\s+')
+
+# Google address component types and the component keys they fill
+_COMPONENT_KEYS = {
+    'locality': 'city',
+    'administrative_area_level_1': 'state',
+    'country': 'country',
+    'postal_code': 'postal_code'
+}
+
+def _parse_components(result: Dict[str, Any]) -> Dict[str, str]:
+    """Extract city, state, country and postal code from a geocoding result."""
+    components = {}
+    for component in result.get('address_components', ()):
+        for component_type in component.get('types', ()):
+            key = _COMPONENT_KEYS.get(component_type)
+            if key:
+                components[key] = component['long_name']
+                break
+    return components
+
 class GeocodingService:
     """Service for geocoding location names to coordinates and addresses."""
     
+    # Results kept in the LRU cache shared by all instances, and seconds
+    # before an entry expires so moved or renamed places are looked up again
+    CACHE_SIZE = 4096
+    CACHE_TTL = 86400
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+    
     def __init__(self):
         self.google_api_key = os.environ.get('GOOGLE_PLACES_API_KEY')
         self.client = None
         if self.google_api_key:
-            self.client = googlemaps.Client(key=self.google_api_key)
+            self.client = googlemaps.Client(key=self.google_api_key, timeout=REQUEST_TIMEOUT, requests_session=_SESSION)
+    
+    @classmethod
+    def _cache_get(cls, key: tuple) -> Optional[Dict[str, Any]]:
+        """Get a fresh cached result. Each caller gets its own copy, so changes
+        to it don't leak into later cache hits."""
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+            if cached is None:
+                return None
+            cached_at, result = cached
+            if time.monotonic() - cached_at >= cls.CACHE_TTL:
+                del cls._cache[key]
+                return None
+            cls._cache.move_to_end(key)
+        return copy.deepcopy(result)
+    
+    @classmethod
+    def _cache_put(cls, key: tuple, result: Dict[str, Any]) -> None:
+        with cls._cache_lock:
+            cls._cache[key] = (time.monotonic(), copy.deepcopy(result))
+            if len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
     
     def geocode_location(self, location_name: str) -> Optional[Dict[str, Any]]:
         """Convert a location name to coordinates and full address.
@@ -34,6 +98,12 @@ class GeocodingService:
         if not location_name or not location_name.strip():
             return None
         
+        # Geocoding results are stable, so repeated names are served from the cache
+        cache_key = ('geocode', _WS_RE.sub(' ', location_name.strip().lower()))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Use Google Geocoding API
             results = self.client.geocode(location_name)
@@ -47,25 +117,16 @@ class GeocodingService:
             geometry = result.get('geometry', {})
             location = geometry.get('location', {})
             
-            # Extract address components
-            components = {}
-            for component in result.get('address_components', []):
-                types = component.get('types', [])
-                if 'locality' in types:
-                    components['city'] = component['long_name']
-                elif 'administrative_area_level_1' in types:
-                    components['state'] = component['long_name']
-                elif 'country' in types:
-                    components['country'] = component['long_name']
-                elif 'postal_code' in types:
-                    components['postal_code'] = component['long_name']
+            components = _parse_components(result)
             
-            return {
+            geocoded = {
                 'coordinates': (location.get('lat'), location.get('lng')),
                 'formatted_address': result.get('formatted_address', ''),
                 'place_id': result.get('place_id', ''),
                 'components': components
             }
+            self._cache_put(cache_key, geocoded)
+            return geocoded
             
         except Exception as e:
             logger.error(f"Error geocoding location '{location_name}': {str(e)}", exc_info=True)
@@ -85,6 +146,12 @@ class GeocodingService:
             logger.error("Google Maps client not initialized. Check GOOGLE_PLACES_API_KEY")
             return None
         
+        # Nearby coordinates (~1 m apart) share a cached address
+        cache_key = ('reverse', round(latitude, 5), round(longitude, 5))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return {**cached, 'coordinates': (latitude, longitude)}
+        
         try:
             results = self.client.reverse_geocode((latitude, longitude))
             
@@ -95,25 +162,16 @@ class GeocodingService:
             # Use the first result
             result = results[0]
             
-            # Extract address components
-            components = {}
-            for component in result.get('address_components', []):
-                types = component.get('types', [])
-                if 'locality' in types:
-                    components['city'] = component['long_name']
-                elif 'administrative_area_level_1' in types:
-                    components['state'] = component['long_name']
-                elif 'country' in types:
-                    components['country'] = component['long_name']
-                elif 'postal_code' in types:
-                    components['postal_code'] = component['long_name']
+            components = _parse_components(result)
             
-            return {
+            reverse_geocoded = {
                 'coordinates': (latitude, longitude),
                 'formatted_address': result.get('formatted_address', ''),
                 'place_id': result.get('place_id', ''),
                 'components': components
             }
+            self._cache_put(cache_key, reverse_geocoded)
+            return reverse_geocoded
             
         except Exception as e:
             logger.error(f"Error reverse geocoding ({latitude}, {longitude}): {str(e)}", exc_info=True)
@@ -1,4 +1,6 @@
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Union
+from urllib.parse import urlsplit
 from .base import URLProcessor
 from .tiktok_processor import TikTokProcessor
 import logging
@@ -8,6 +10,9 @@ logger = logging.getLogger(__name__)
 class URLProcessorOrchestrator:
     """Orchestrates multiple URL processors to handle various platforms."""
     
+    # Threads shared by process_urls calls; the work is waiting on platform APIs
+    MAX_WORKERS = 8
+    
     def __init__(self):
         self.processors: List[URLProcessor] = [
             TikTokProcessor(),
@@ -16,6 +21,43 @@ class URLProcessorOrchestrator:
             # YouTubeProcessor(),
             # etc.
         ]
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="url-processor")
+        
+        # Platform names are fixed once the processors are registered
+        self._platform_names = tuple(
+            p.__class__.__name__.replace("Processor", "").lower()
+            for p in self.processors
+        )
+        self._name_by_processor = dict(zip(self.processors, self._platform_names))
+        
+        # Processors indexed by the hostnames they declare
+        self._by_host = {host: p for p in self.processors for host in p.hosts}
+        self._hostless = [p for p in self.processors if not p.hosts]
+        
+        # When every processor declares tokens, a URL containing none of them
+        # can be rejected without parsing it
+        self._all_tokens = (
+            tuple(t for p in self.processors for t in p.tokens)
+            if all(p.tokens for p in self.processors) else None
+        )
+    
+    def _find_processor(self, url: str) -> Optional[URLProcessor]:
+        """Pick the processor for a URL by its host, falling back to processors without declared hosts."""
+        if self._all_tokens is not None and not any(t in url for t in self._all_tokens):
+            return None
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            host = None
+        processor = self._by_host.get(host) if host else None
+        if processor and processor.can_process(url):
+            return processor
+        for p in self._hostless:
+            if p.tokens and not any(t in url for t in p.tokens):
+                continue
+            if p.can_process(url):
+                return p
+        return None
     
     def process_url(self, url: str) -> Dict[str, Any]:
         """Process a URL using the appropriate processor.
@@ -27,11 +69,7 @@ class URLProcessorOrchestrator:
             - location_info: Optional[Dict[str, Any]] (extracted location)
         """
         # Find appropriate processor
-        processor = None
-        for p in self.processors:
-            if p.can_process(url):
-                processor = p
-                break
+        processor = self._find_processor(url)
         
         if not processor:
             raise ValueError(f"No processor available for URL: {url}")
@@ -42,17 +80,30 @@ class URLProcessorOrchestrator:
             location_info = processor.extract_location_info(data)
             
             return {
-                "processor_type": processor.__class__.__name__.replace("Processor", "").lower(),
+                "processor_type": self._name_by_processor[processor],
                 "data": data,
                 "location_info": location_info
             }
         except Exception as e:
-            logger.error(f"Error processing URL {url}: {str(e)}", exc_info=True)
+            # Lazy %-formatting: the message is only built if an ERROR record is emitted
+            logger.exception("Error processing URL %s: %s", url, e)
             raise
     
+    def process_urls(self, urls: List[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """Process several URLs concurrently.
+        
+        Returns one entry per URL, in order: the process_url result, or the
+        exception it raised.
+        """
+        futures = [self._pool.submit(self.process_url, url) for url in urls]
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+    
     def get_supported_platforms(self) -> List[str]:
         """Get list of supported platforms."""
-        return [
-            p.__class__.__name__.replace("Processor", "").lower() 
-            for p in self.processors
-        ]
\ No newline at end of file
+        return list(self._platform_names)
\ No newline at end of file
@@ -0,0 +1,11 @@
+import re
+
+# ASCII and C1 control characters, which clients sometimes paste into URLs
+_CTRL_RE = re.compile(r'[\x00-\x1f\x7f-\x9f]')
+
+def strip_control_chars(s: str) -> str:
+    """Remove control characters from a string."""
+    # Most input is clean, so check before paying for a substitution
+    if _CTRL_RE.search(s) is None:
+        return s
+    return _CTRL_RE.sub('', s)
@@ -1,18 +1,106 @@
 import re
+import orjson
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional
 from .base import URLProcessor
 import logging
 import os
 import time
 import hashlib
+import threading
 import urllib.parse
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
+try:
+    # google-re2 classifies URLs in linear time without backtracking
+    import re2 as _url_re
+except ImportError:
+    _url_re = re
+
+# Supported TikTok URL shapes (video page, /t/ short link, vm. short link) in one pattern
+_TIKTOK_URL_RE = _url_re.compile(
+    r'https?://(?:(?:www\.)?tiktok\.com/(?:@[\w.-]+/video/\d+|t/[\w]+)|vm\.tiktok\.com/[\w]+)'
+)
+
+_HASHTAG_RE = re.compile(r'#(\w+)')
+
+# Location hints in captions, tried in order
+_LOCATION_RES = (
+    (re.compile(r'📍\s*([^\.#\n]+?)(?:\.\.\.|#|\n|$)', re.IGNORECASE), 'pin'),  # Pin emoji followed by location
+    (re.compile(r'(?:at|in|from)\s+([A-Z][^,#\n.!?]{2,30})(?:\s|#|$)', re.IGNORECASE), 'preposition'),  # "at/in/from" followed by capitalized words
+    (re.compile(r'#([a-zA-Z]+(?:city|place|location|travel))', re.IGNORECASE), 'hashtag'),  # Location-related hashtags
+)
+
+_VIDEO_ID_RE = re.compile(r'/video/(\d+)')
+_SHORT_ID_RE = re.compile(r'/t/([\w]+)')
+_VM_ID_RE = re.compile(r'vm\.tiktok\.com/([\w]+)')
+
+# POI fields passed through as the video's location; missing ones become None
+_POI_KEYS = ("name", "address", "latitude", "longitude", "city", "country")
+
+# Read-only stand-in for missing nested objects in API responses
+_EMPTY = MappingProxyType({})
+
+# URLs are often classified and parsed repeatedly (retries, duplicate shares),
+# so both results are memoized per URL
+@lru_cache(maxsize=8192)
+def _is_tiktok_url(url: str) -> bool:
+    return _TIKTOK_URL_RE.match(url) is not None
+
+@lru_cache(maxsize=8192)
+def _video_id_from_url(url: str) -> str:
+    """Extract video ID from various TikTok URL formats."""
+    # Fast path: read the ID straight from the path of the usual URL shapes
+    parts = urllib.parse.urlsplit(url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    if len(segments) >= 2:
+        if segments[-2] == 'video' and segments[-1].isdigit():
+            return segments[-1]
+        if segments[-2] == 't' and segments[-1].isascii() and segments[-1].isalnum():
+            return segments[-1]
+    elif parts.hostname == 'vm.tiktok.com' and segments and segments[0].isascii() and segments[0].isalnum():
+        return segments[0]
+    
+    # Direct video URL
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    
+    # Short URL - would need to be resolved
+    match = _SHORT_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    
+    # VM short URL
+    match = _VM_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    
+    raise ValueError("Could not extract video ID from URL")
+
+def _canonical_url(url: str) -> str:
+    """Host and path of a TikTok URL, without the tracking query string or trailing slash."""
+    parsed = urllib.parse.urlsplit(url)
+    return f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+
 class TikTokProcessor(URLProcessor):
     """Processor for TikTok URLs to extract video metadata and location information."""
     
+    hosts = frozenset({"tiktok.com", "www.tiktok.com", "vm.tiktok.com"})
+    tokens = ("tiktok.com",)
+    
+    # oEmbed responses rarely change, so they are reused for an hour
+    OEMBED_CACHE_TTL = 3600
+    OEMBED_CACHE_SIZE = 4096
+    # Most video IDs the video query endpoint accepts in one request
+    VIDEO_QUERY_BATCH_SIZE = 20
+    
     def __init__(self):
         # TikTok API credentials
         self.client_key = os.environ.get('TIKTOK_CLIENT_KEY')
@@ -26,24 +114,28 @@ class TikTokProcessor(URLProcessor):
         # For public web API (alternative approach)
         self.oembed_url = "https://www.tiktok.com/oembed"
         
+        # Pooled keep-alive connections to tiktok.com and the TikTok API, with
+        # short retries on gateway errors
+        self.session = requests.Session()
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retries))
+        
+        # oEmbed responses keyed by canonical URL
+        self._oembed_cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._oembed_cache_lock = threading.Lock()
+        
         # Token cache
         self._cached_token = None
         self._token_expires_at = 0
         
     def can_process(self, url: str) -> bool:
         """Check if URL is a TikTok URL."""
-        tiktok_patterns = [
-            r'https?://(?:www\.)?tiktok\.com/@[\w.-]+/video/\d+',
-            r'https?://(?:www\.)?tiktok\.com/t/[\w]+',
-            r'https?://vm\.tiktok\.com/[\w]+',
-        ]
-        return any(re.match(pattern, url) for pattern in tiktok_patterns)
+        return _is_tiktok_url(url)
     
     def extract_data(self, url: str) -> Dict[str, Any]:
         """Extract video data from TikTok URL using available APIs."""
-        if not self.validate_url(url):
-            raise ValueError("Invalid URL format")
-            
+        # can_process already requires an http(s) scheme and a TikTok host, which
+        # covers everything validate_url checks
         if not self.can_process(url):
             raise ValueError("URL is not a valid TikTok URL")
         
@@ -107,12 +199,27 @@ class TikTokProcessor(URLProcessor):
     
     def _fetch_oembed_data(self, url: str) -> Optional[Dict[str, Any]]:
         """Fetch data using TikTok's oEmbed API (no auth required)."""
+        key = _canonical_url(url)
+        with self._oembed_cache_lock:
+            cached = self._oembed_cache.get(key)
+            if cached is not None:
+                cached_at, oembed_data = cached
+                if time.monotonic() - cached_at < self.OEMBED_CACHE_TTL:
+                    self._oembed_cache.move_to_end(key)
+                    return oembed_data
+                del self._oembed_cache[key]
+        
         try:
             params = {"url": url}
-            response = requests.get(self.oembed_url, params=params, timeout=10)
+            response = self.session.get(self.oembed_url, params=params, timeout=10)
             
             if response.status_code == 200:
-                return response.json()
+                oembed_data = orjson.loads(response.content)
+                with self._oembed_cache_lock:
+                    self._oembed_cache[key] = (time.monotonic(), oembed_data)
+                    if len(self._oembed_cache) > self.OEMBED_CACHE_SIZE:
+                        self._oembed_cache.popitem(last=False)
+                return oembed_data
             else:
                 logger.error(f"oEmbed API returned status {response.status_code}: {response.text}")
                 return None
@@ -145,10 +252,10 @@ class TikTokProcessor(URLProcessor):
                 "grant_type": "client_credentials"
             }
             
-            response = requests.post(self.token_url, headers=headers, data=data, timeout=10)
+            response = self.session.post(self.token_url, headers=headers, data=data, timeout=10)
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = orjson.loads(response.content)
                 access_token = token_data.get("access_token")
                 expires_in = token_data.get("expires_in", 7200)
                 
@@ -167,12 +274,40 @@ class TikTokProcessor(URLProcessor):
     
     def _fetch_video_details(self, url: str) -> Dict[str, Any]:
         """Fetch detailed video data using TikTok's official API (requires auth)."""
+        video_id = self._extract_video_id(url)
+        videos = self._query_videos([video_id])
+        if videos:
+            return self._video_record(videos[0], video_id, url)
+        raise Exception("Failed to fetch video details from TikTok API")
+    
+    def fetch_video_details_bulk(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch detailed video data for many URLs, VIDEO_QUERY_BATCH_SIZE videos per API call.
+        
+        Returns a dict mapping video ID to the same record _fetch_video_details
+        builds; videos the API doesn't return are left out.
+        """
+        urls_by_id: Dict[str, str] = {}
+        for url in urls:
+            try:
+                urls_by_id.setdefault(self._extract_video_id(url), url)
+            except ValueError:
+                logger.warning(f"Skipping URL without a video ID: {url}")
+        
+        video_ids = list(urls_by_id)
+        details = {}
+        for start in range(0, len(video_ids), self.VIDEO_QUERY_BATCH_SIZE):
+            for video in self._query_videos(video_ids[start:start + self.VIDEO_QUERY_BATCH_SIZE]) or ():
+                video_id = str(video.get("id", ""))
+                if video_id in urls_by_id:
+                    details[video_id] = self._video_record(video, video_id, urls_by_id[video_id])
+        return details
+    
+    def _query_videos(self, video_ids: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Query the TikTok API for a batch of videos. Returns None if the request fails."""
         access_token = self._get_access_token()
         if not access_token:
             raise ValueError("Could not obtain TikTok API access token")
         
-        video_id = self._extract_video_id(url)
-        
         # TikTok API v2 request
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -193,71 +328,71 @@ class TikTokProcessor(URLProcessor):
         try:
             # Note: The exact endpoint and request format depends on your API access level
             # This is based on TikTok's Content Posting API
-            response = requests.post(
+            response = self.session.post(
                 self.video_query_url,
                 headers=headers,
-                json={"video_ids": [video_id]},
+                json={"video_ids": video_ids},
                 params=params,
                 timeout=10
             )
             
             if response.status_code == 200:
-                data = response.json()
-                videos = data.get("videos", [])
-                
-                if videos:
-                    video = videos[0]
-                    return {
-                        "video_id": video.get("id", video_id),
-                        "url": video.get("share_url", url),
-                        "caption": video.get("caption", video.get("description", "")),
-                        "location": self._extract_location_from_poi(video.get("poi_info")),
-                        "hashtags": self._extract_hashtags(video.get("caption", "")),
-                        "created_at": video.get("create_time"),
-                        "author": {
-                            "username": video.get("author", {}).get("username", ""),
-                            "display_name": video.get("author", {}).get("display_name", "")
-                        },
-                        "statistics": video.get("statistics", {}),
-                        "music": video.get("music", {}),
-                        "thumbnail_url": video.get("cover", {}).get("url", "")
-                    }
+                data = orjson.loads(response.content)
+                return data.get("videos", [])
             else:
                 logger.error(f"TikTok API returned status {response.status_code}: {response.text}")
                 
         except Exception as e:
             logger.error(f"Error calling TikTok API: {str(e)}")
-            
-        raise Exception("Failed to fetch video details from TikTok API")
+        
+        return None
+    
+    def _video_record(self, video: Dict[str, Any], video_id: str, url: str) -> Dict[str, Any]:
+        """Build the video data returned to callers from a TikTok API video object."""
+        author = video.get("author") or _EMPTY
+        cover = video.get("cover") or _EMPTY
+        return {
+            "video_id": video.get("id", video_id),
+            "url": video.get("share_url", url),
+            "caption": video.get("caption", video.get("description", "")),
+            "location": self._extract_location_from_poi(video.get("poi_info")),
+            "hashtags": self._extract_hashtags(video.get("caption", "")),
+            "created_at": video.get("create_time"),
+            "author": {
+                "username": author.get("username", ""),
+                "display_name": author.get("display_name", "")
+            },
+            "statistics": video.get("statistics", {}),
+            "music": video.get("music", {}),
+            "thumbnail_url": cover.get("url", "")
+        }
     
     def _extract_location_from_poi(self, poi_info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """Extract location data from POI (Point of Interest) info."""
         if not poi_info:
             return None
-            
-        return {
-            "name": poi_info.get("name", ""),
-            "address": poi_info.get("address", ""),
-            "latitude": poi_info.get("latitude"),
-            "longitude": poi_info.get("longitude"),
-            "city": poi_info.get("city", ""),
-            "country": poi_info.get("country", "")
-        }
+        return {key: poi_info.get(key) for key in _POI_KEYS}
     
     def _extract_hashtags(self, text: str) -> list:
         """Extract hashtags from text."""
         if not text:
             return []
-        hashtags = re.findall(r'#(\w+)', text)
-        return list(set(hashtags))  # Remove duplicates
+        # Remove duplicates, keeping first-seen order
+        return list(dict.fromkeys(_HASHTAG_RE.findall(text)))
     
     def extract_location_info(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Extract location information from TikTok video data."""
+        location = data.get("location")
+        caption = data.get("caption") or data.get("title", "")
+        
+        # Nothing to extract from: most videos carry no location and no caption
+        if not location and not caption:
+            return None
+        
         location_info = {}
         
         # Check if location data is directly available (from poi_info)
-        if data.get("location"):
-            location = data["location"]
+        if location:
             if isinstance(location, dict) and location.get("name"):
                 location_info["location_name"] = location.get("name", "")
                 if location.get("latitude") and location.get("longitude"):
@@ -273,21 +408,14 @@ class TikTokProcessor(URLProcessor):
                     location_info["country"] = location["country"]
         
         # If no direct location, try to extract from caption/title
-        caption = data.get("caption") or data.get("title", "")
         if caption and not location_info.get("location_name"):
             location_info["raw_text"] = caption
             
             # Look for location patterns in caption
-            location_patterns = [
-                (r'📍\s*([^\.#\n]+?)(?:\.\.\.|#|\n|$)', 'pin'),  # Pin emoji followed by location
-                (r'(?:at|in|from)\s+([A-Z][^,#\n.!?]{2,30})(?:\s|#|$)', 'preposition'),  # "at/in/from" followed by capitalized words
-                (r'#([a-zA-Z]+(?:city|place|location|travel))', 'hashtag'),  # Location-related hashtags
-            ]
-            
-            for pattern, pattern_type in location_patterns:
-                matches = re.findall(pattern, caption, re.IGNORECASE)
-                if matches:
-                    location_info["location_name"] = matches[0].strip()
+            for pattern, pattern_type in _LOCATION_RES:
+                match = pattern.search(caption)
+                if match:
+                    location_info["location_name"] = match.group(1).strip()
                     logger.debug(f"Found location '{location_info['location_name']}' using {pattern_type} pattern")
                     break
         
@@ -299,19 +427,4 @@ class TikTokProcessor(URLProcessor):
     
     def _extract_video_id(self, url: str) -> str:
         """Extract video ID from various TikTok URL formats."""
-        # Direct video URL
-        match = re.search(r'/video/(\d+)', url)
-        if match:
-            return match.group(1)
-        
-        # Short URL - would need to be resolved
-        match = re.search(r'/t/([\w]+)', url)
-        if match:
-            return match.group(1)
-        
-        # VM short URL
-        match = re.search(r'vm\.tiktok\.com/([\w]+)', url)
-        if match:
-            return match.group(1)
-        
-        raise ValueError("Could not extract video ID from URL")
\ No newline at end of file
+        return _video_id_from_url(url)
\ No newline at end of file